@@ -0,0 +1,7 @@
+"""Python data pipeline for the FitSaga video catalog.
+
+Every task is exposed as a subcommand of ``python -m pipeline`` (run from the
+``admin-portal`` directory). Heavy modules such as pandas, tqdm and
+firebase_admin are imported inside the subcommands that need them, so quick
+commands start without paying for them.
+"""
@@ -0,0 +1,30 @@
+"""``backup``: export a Firestore collection to a timestamped JSON file."""
+import datetime
+import json
+import logging
+
+from pipeline.firebase import get_db
+
+
+def backup_collection(db, collection='videos'):
+    """Return ``{document_id: data}`` for every document in ``collection``."""
+    backup_data = {}
+    for doc in db.collection(collection).get():
+        backup_data[doc.id] = doc.to_dict()
+    return backup_data
+
+
+def run(args):
+    backup_data = backup_collection(get_db(), args.collection)
+
+    # Save to a timestamped file
+    output = args.output
+    if not output:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = f'firebase_{args.collection}_backup_{timestamp}.json'
+
+    with open(output, 'w') as f:
+        json.dump(backup_data, f, indent=2, default=str)
+
+    logging.info(f"Backup complete. Saved {len(backup_data)} {args.collection} documents to {output}")
+    return 0
@@ -0,0 +1,196 @@
+"""``bench``: time the pipeline stages on synthetic catalogs.
+
+Each size runs the same stages the real pipeline does, in order:
+
+``generate``    build synthetic video_details/thumbnail frames (not a pipeline stage, for reference)
+``normalize``   ``clean_video_id`` over both video ID columns
+``merge``       ``join_video_details`` (the join in joinedmappedfile.py)
+``payloads``    ``build_video_payload`` for every catalog row via ``iterrows``
+``plan_index``  ``build_plan_indexes`` over the merged rows
+``upload``      ``upload_catalog`` into a fresh in-memory Firestore
+``verify``      ``verify_catalog`` against that in-memory Firestore
+
+Results are written as JSON (one file per run, named after the package
+version and git revision) so two runs can be compared with ``--compare``.
+"""
+import datetime
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from pipeline import paths
+
+STAGES = ['generate', 'normalize', 'merge', 'payloads', 'plan_index', 'upload', 'verify']
+RESULTS_DIR = paths.BASE_DIR / 'benchmarks'
+
+
+def parse_size(text):
+    """``'10k'`` -> 10000, ``'1m'`` -> 1000000."""
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def code_version():
+    with open(paths.BASE_DIR / 'package.json', encoding='utf-8') as f:
+        version = json.load(f).get('version', '0')
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=paths.BASE_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = 'unknown'
+    return version, revision
+
+
+def _time(func, repeat, setup=None):
+    """Run ``func`` ``repeat`` times; returns ``(last_result, [seconds, ...])``."""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = func(arg) if setup else func()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+
+def bench_size(rows, seed=0, repeat=3, stages=STAGES):
+    """Benchmark every stage for one catalog size; returns the result dict."""
+    from pipeline.catalog import build_video_payload, clean_video_id
+    from pipeline.fake_firestore import FakeFirestore
+    from pipeline.firebase import server_timestamp
+    from pipeline.merge import join_video_details
+    from pipeline.plan_index import build_plan_indexes
+    from pipeline.sync import upload_catalog
+    from pipeline.synthetic import generate_frames
+    from pipeline.verify import verify_catalog
+
+    timings = {}
+
+    def record(stage, func, setup=None):
+        # Every stage needs the previous one's output, so all of them run; only
+        # the selected ones are repeated and reported.
+        result, runs = _time(func, repeat if stage in stages else 1, setup)
+        if stage in stages:
+            timings[stage] = runs
+        return result
+
+    def upload(db):
+        upload_catalog(db, catalog, pause=0, progress=False)
+        return db
+
+    video_details, thumbnails = record('generate', lambda: generate_frames(rows, seed))
+    record('normalize', lambda: (video_details['videovalue'].apply(clean_video_id),
+                                 thumbnails['videoId'].apply(clean_video_id)))
+    catalog = record('merge', lambda: join_video_details(video_details, thumbnails))
+
+    last_updated = server_timestamp()
+    if 'payloads' in stages:
+        record('payloads', lambda: [build_video_payload(row, last_updated) for _, row in catalog.iterrows()])
+
+    if 'plan_index' in stages:
+        records = catalog.to_dict('records')
+        record('plan_index', lambda: build_plan_indexes(records))
+
+    if 'upload' in stages or 'verify' in stages:
+        db = record('upload', upload, setup=FakeFirestore)
+        if 'verify' in stages:
+            record('verify', lambda: verify_catalog(db, catalog, sample_size=100))
+
+    result = {'rows': rows, 'catalog_rows': len(catalog), 'stages': {}}
+    for stage, runs in timings.items():
+        median = statistics.median(runs)
+        result['stages'][stage] = {
+            'min': round(min(runs), 6),
+            'median': round(median, 6),
+            'runs': [round(r, 6) for r in runs],
+            'rows_per_sec': round(len(catalog) / median) if median else None,
+        }
+    return result
+
+
+def run_benchmarks(sizes, seed=0, repeat=3, stages=STAGES):
+    import pandas as pd
+
+    version, revision = code_version()
+    report = {
+        'version': version,
+        'revision': revision,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': {},
+    }
+
+    # verify logs one line per sampled document (and warns about the duplicate
+    # rows the catalog really has); keep the timings clean
+    logging.disable(logging.WARNING)
+    try:
+        for rows in sizes:
+            report['results'][str(rows)] = bench_size(rows, seed, repeat, stages)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    return report
+
+
+def compare(old, new, threshold=1.2):
+    """Return ``[(size, stage, old_median, new_median, ratio), ...]`` slower than ``threshold``."""
+    regressions = []
+    for size, new_result in new['results'].items():
+        old_result = old['results'].get(size)
+        if not old_result:
+            continue
+        for stage, timing in new_result['stages'].items():
+            old_timing = old_result['stages'].get(stage)
+            if not old_timing or not old_timing['median']:
+                continue
+            ratio = timing['median'] / old_timing['median']
+            if ratio > threshold:
+                regressions.append((size, stage, old_timing['median'], timing['median'], ratio))
+    return regressions
+
+
+def print_report(report):
+    print(f"{'rows':>9} {'stage':<11} {'median s':>10} {'min s':>10} {'rows/s':>12}")
+    for size, result in report['results'].items():
+        for stage, timing in result['stages'].items():
+            print(f"{size:>9} {stage:<11} {timing['median']:>10.4f} {timing['min']:>10.4f} "
+                  f"{timing['rows_per_sec'] or 0:>12,}")
+
+
+def run(args):
+    sizes = [parse_size(s) for s in args.sizes.split(',')]
+    stages = args.stages.split(',') if args.stages else STAGES
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    report = run_benchmarks(sizes, args.seed, args.repeat, stages)
+    print_report(report)
+
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"bench-{report['version']}-{report['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Wrote benchmark results to {output}")
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, report, args.threshold)
+    for size, stage, old_median, new_median, ratio in regressions:
+        logging.warning(f"REGRESSION {stage} @ {size} rows: {old_median:.4f}s -> {new_median:.4f}s ({ratio:.2f}x)")
+    if not regressions:
+        logging.info(f"No stage slower than {args.threshold:.2f}x the baseline ({baseline.get('revision')})")
+    return 1 if regressions else 0
@@ -0,0 +1,57 @@
+"""Helpers shared by the commands that read the merged video catalog."""
+import math
+
+VIDEO_METADATA_COLLECTION = 'videoMetadata'
+
+# Columns update_firebase_from_csv.py has always required in merged_video_data.csv
+REQUIRED_COLUMNS = ['thumbnailId', 'videoId_x', 'activity', 'type', 'bodypart',
+                    'plan_id', 'day_id', 'videourl', 'thumbnailUrl']
+
+
+def is_missing(value):
+    """True for None and NaN, the two ways pandas/csv report an empty cell."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def clean_video_id(video_id):
+    """Normalize a video ID so catalog and thumbnail rows can be matched."""
+    if is_missing(video_id):
+        return ""
+
+    # Remove file extension
+    video_id = str(video_id)
+    if video_id.endswith('.mp4'):
+        video_id = video_id.replace('.mp4', '')
+
+    # Replace underscores with spaces (if needed)
+    video_id = video_id.replace('_', ' ')
+
+    return video_id.strip()
+
+
+def video_doc_id(row):
+    """Document ID of a catalog row in the videoMetadata collection."""
+    return f"{row['plan_id']}_{row['day_id']}_{row['videoId_x']}"
+
+
+def build_video_payload(row, last_updated):
+    """Build the videoMetadata document for one merged catalog row."""
+    return {
+        'activity': row['activity'],
+        'bodypart': row['bodypart'],
+        'dayId': str(row['day_id']),
+        'dayName': row['day_name'] if 'day_name' in row else row.get('dayName', ''),
+        'planId': str(row['plan_id']),
+        'thumbnailId': str(row['thumbnailId']),
+        'thumbnailUrl': row['thumbnailUrl'],
+        'type': row['type'],
+        'videoId': row['videoId_x'],
+        'videoUrl': row['videourl'],
+        'lastUpdated': last_updated,
+    }
+
+
+def check_columns(columns, required=REQUIRED_COLUMNS):
+    missing_columns = [col for col in required if col not in columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns in CSV: {', '.join(missing_columns)}")
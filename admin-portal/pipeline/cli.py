@@ -0,0 +1,209 @@
+"""Command line entry point: ``python -m pipeline <command> [options]``.
+
+Subcommand handlers are referenced as ``'module:function'`` strings and only
+imported once the command has been chosen, so ``--help`` or a quick
+``test-connection`` never loads pandas or tqdm.
+"""
+import argparse
+import importlib
+import logging
+import sys
+
+from pipeline import paths
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def setup_logging(log_file=None, verbose=False):
+    level = logging.DEBUG if verbose else logging.INFO
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers, force=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pipeline', description='FitSaga video catalog pipeline')
+    parser.add_argument('--credentials', help='service account JSON (default: $FITSAGA_CREDENTIALS or scripts/credentials.json)')
+    parser.add_argument('--emulator', metavar='HOST:PORT', help='use the Firestore emulator instead of production')
+    parser.add_argument('--project', help='Firebase project ID')
+    parser.add_argument('--log-file', help='also write the log to this file')
+    parser.add_argument('--profile', action='store_true',
+                        help='record wall/CPU time and memory per stage and print a summary')
+    parser.add_argument('--profile-dir', help='also dump cProfile stats per stage into this directory')
+    parser.add_argument('--max-attempts', type=int, help='attempts per Firestore/HTTP call on transient errors (default 5)')
+    parser.add_argument('--retry-budget', type=int, help='retries allowed per run before giving up early (default 100)')
+    parser.add_argument('-v', '--verbose', action='store_true')
+
+    commands = parser.add_subparsers(dest='command', metavar='command', required=True)
+
+    p = commands.add_parser('test-connection', help='read a few videoMetadata documents')
+    p.add_argument('--limit', type=int, default=3)
+    p.add_argument('--write', action='store_true', help='also write script_tests/test_doc')
+    p.set_defaults(handler='pipeline.connection:run')
+
+    p = commands.add_parser('backup', help='export a collection to JSON')
+    p.add_argument('--collection', default='videos')
+    p.add_argument('-o', '--output', help='output file (default: timestamped)')
+    p.set_defaults(handler='pipeline.backup:run')
+
+    p = commands.add_parser('join', help='build merged_video_data.csv from video_details.csv')
+    p.add_argument('--video-details', default=str(paths.VIDEO_DETAILS_CSV))
+    p.add_argument('--thumbnails', default=str(paths.THUMBNAILS_CSV))
+    p.add_argument('-o', '--output', default=str(paths.MERGED_CSV))
+    p.set_defaults(handler='pipeline.merge:run_join')
+
+    p = commands.add_parser('update-thumbnails', help='set thumbnailUrl on existing videoMetadata documents')
+    p.add_argument('--videos', default=str(paths.VIDEO_DETAILS_MODIFIED_CSV))
+    p.add_argument('--thumbnails', default=str(paths.THUMBNAILS_CSV))
+    p.add_argument('--batch-size', type=int, default=20)
+    p.add_argument('--batch-pause', type=float, default=2.0)
+    p.set_defaults(handler='pipeline.merge:run_update_thumbnails')
+
+    p = commands.add_parser('sync', help='replace videoMetadata with merged_video_data.csv')
+    p.add_argument('--csv', default=str(paths.MERGED_CSV))
+    p.add_argument('--batch-size', type=int, default=500)
+    p.add_argument('--pause', type=float, default=1.0, help='seconds to wait between batches')
+    p.add_argument('--yes', action='store_true', help='skip the DELETE confirmation prompt')
+    p.add_argument('--write-order', choices=['csv', 'interleave', 'hash'], default='interleave',
+                   help='spread writes over the key space (interleave by plan, hash by document ID) '
+                        'instead of writing sequential IDs in CSV order')
+    p.set_defaults(handler='pipeline.sync:run')
+
+    p = commands.add_parser('verify', help='compare videoMetadata with merged_video_data.csv')
+    p.add_argument('--csv', default=str(paths.MERGED_CSV))
+    p.add_argument('--sample-size', type=int, default=5)
+    p.add_argument('--replica', nargs='?', const=str(paths.REPLICA_DB), metavar='SQLITE',
+                   help='read from the local replica instead of Firestore')
+    p.set_defaults(handler='pipeline.verify:run')
+
+    p = commands.add_parser('plan-index', help='upload per-plan day/video index documents')
+    p.add_argument('--csv', default=str(paths.MERGED_CSV))
+    p.add_argument('-o', '--output', help='also write the indexes to this JSON file')
+    p.add_argument('--no-upload', action='store_true', help='build (and --output) only')
+    p.add_argument('--force', action='store_true', help='write every plan, even if unchanged')
+    p.add_argument('--prune', action='store_true', help='delete indexes of plans no longer in the CSV')
+    p.add_argument('--dry-run', action='store_true', help='report what would be written')
+    p.set_defaults(handler='pipeline.plan_index:run')
+
+    p = commands.add_parser('search-index', help='build the sharded exercise search index')
+    p.add_argument('--csv', default=str(paths.MERGED_CSV))
+    p.add_argument('--metadata', default=str(paths.COMPLETE_METADATA_CSV),
+                   help='extra descriptions keyed by video file name')
+    p.add_argument('-o', '--output-dir', default='search-index')
+    p.add_argument('--upload', action='store_true', help='also store it in the searchIndex collection')
+    p.add_argument('--query', help='run a test query against the freshly built index')
+    p.set_defaults(handler='pipeline.search_index:run')
+
+    p = commands.add_parser('bench', help='time the pipeline stages on synthetic catalogs')
+    p.add_argument('--sizes', default='10k,100k', help='comma separated row counts, e.g. 10k,100k,1m')
+    p.add_argument('--stages', help='comma separated subset of stages to report')
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-o', '--output', help='results JSON (default: benchmarks/bench-<version>-<rev>.json)')
+    p.add_argument('--compare', metavar='JSON', help='baseline results to check for regressions')
+    p.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio reported as a regression')
+    p.set_defaults(handler='pipeline.bench:run')
+
+    p = commands.add_parser('load-test', help='measure a writer against a throttled, faulty in-memory Firestore')
+    p.add_argument('--writer', choices=['sync', 'update-thumbnails'], default='sync')
+    p.add_argument('--rows', default='10k')
+    p.add_argument('--workers', type=int, default=1)
+    p.add_argument('--batch-size', type=int, default=500)
+    p.add_argument('--latency', default='lognormal:40,0.5',
+                   help='none, const:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA')
+    p.add_argument('--per-write-ms', type=float, default=0.05, help='extra latency per document in a call')
+    p.add_argument('--spike-rate', type=float, default=0.0, help='fraction of calls that get --spike-ms extra')
+    p.add_argument('--spike-ms', type=float, default=1000.0)
+    p.add_argument('--error', action='append', metavar='CODE=RATE',
+                   help='inject RESOURCE_EXHAUSTED, DEADLINE_EXCEEDED, ABORTED or UNAVAILABLE (repeatable)')
+    p.add_argument('--writes-per-second', type=float, help='document write quota')
+    p.add_argument('--reads-per-second', type=float, help='document read quota')
+    p.add_argument('--deadline', type=float, help='seconds before a call fails with DEADLINE_EXCEEDED')
+    p.add_argument('--range-writes-per-second', type=float,
+                   help='writes each key range (tablet) applies per second; models hotspotting')
+    p.add_argument('--key-ranges', type=int, default=64,
+                   help='number of key ranges, equal spans of the sorted document IDs')
+    p.add_argument('--write-order', choices=['csv', 'interleave', 'hash'], default='interleave')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-o', '--output', help='write the report as JSON')
+    p.set_defaults(handler='pipeline.load_test:run')
+
+    p = commands.add_parser('run', help='run the out-of-date stages of a full catalog refresh')
+    p.add_argument('stages', nargs='*', metavar='stage',
+                   help='stages to bring up to date, with their upstream (default: all but update-thumbnails)')
+    p.add_argument('--force', action='append', metavar='STAGE',
+                   help="run STAGE even if its inputs are unchanged ('all' for every stage; repeatable)")
+    p.add_argument('-j', '--jobs', type=int, default=4, help='stages to run in parallel')
+    p.add_argument('--dry-run', action='store_true', help='only report which stages would run')
+    p.add_argument('--yes', action='store_true',
+                   help='let sync delete and rewrite videoMetadata when it is out of date')
+    p.add_argument('--state', default=str(paths.RUN_STATE))
+    p.set_defaults(handler='pipeline.runner:run')
+
+    p = commands.add_parser('check-thumbnails', help='report videos without a thumbnail')
+    p.add_argument('--thumbnails', default=str(paths.THUMBNAILS_CSV))
+    p.add_argument('--no-match', dest='match', action='store_false',
+                   help='only print the counts, skip matching against the thumbnails CSV')
+    p.add_argument('--replica', nargs='?', const=str(paths.REPLICA_DB), metavar='SQLITE',
+                   help='read from the local replica instead of Firestore')
+    p.set_defaults(handler='pipeline.thumbnails:run')
+
+    p = commands.add_parser('replica', help='mirror videoMetadata into a local SQLite database')
+    p.add_argument('--db', default=str(paths.REPLICA_DB))
+    p.add_argument('--full', action='store_true', help='reload everything (also picks up deletions)')
+    p.add_argument('--poll-interval', type=float, metavar='SECONDS',
+                   help='keep polling lastUpdated for changes every SECONDS')
+    p.add_argument('--watch', action='store_true', help='keep current with a snapshot listener')
+    p.add_argument('--sql', help='run a query against the mirror and print the rows')
+    p.set_defaults(handler='pipeline.replica:run')
+
+    p = commands.add_parser('download', help='download video images listed in video_details.csv')
+    p.add_argument('--csv', default=str(paths.VIDEO_DETAILS_CSV))
+    p.add_argument('-o', '--output-dir', default='downloaded_videos')
+    p.add_argument('--workers', type=int, default=1, help='parallel downloads')
+    p.set_defaults(handler='pipeline.download:run')
+
+    return parser
+
+
+def resolve_handler(spec):
+    module_name, func_name = spec.split(':')
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_file, args.verbose)
+
+    if args.credentials or args.emulator or args.project:
+        from pipeline import firebase
+
+        firebase.configure(args.credentials, args.emulator, args.project)
+
+    if args.max_attempts or args.retry_budget is not None:
+        from pipeline import resilience
+
+        resilience.configure(max_attempts=args.max_attempts, retry_budget=args.retry_budget)
+
+    if args.profile or args.profile_dir:
+        from pipeline import profiling
+
+        profiling.configure(cprofile_dir=args.profile_dir)
+
+    try:
+        return resolve_handler(args.handler)(args)
+    except KeyboardInterrupt:
+        logging.warning("Interrupted")
+        return 130
+    except Exception as e:
+        logging.error(f"{args.command} failed: {str(e)}")
+        logging.exception("Detailed error information:")
+        return 1
+    finally:
+        if args.profile or args.profile_dir:
+            profiling.print_summary()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
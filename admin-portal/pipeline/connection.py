@@ -0,0 +1,30 @@
+"""``test-connection``: check that the configured Firestore client works."""
+import logging
+
+from pipeline.catalog import VIDEO_METADATA_COLLECTION
+from pipeline.firebase import get_db, server_timestamp
+
+
+def run(args):
+    db = get_db()
+
+    # Test reading from videoMetadata collection
+    doc_list = list(db.collection(VIDEO_METADATA_COLLECTION).limit(args.limit).get())
+
+    logging.info("Successfully connected to Firebase")
+    logging.info(f"Retrieved {len(doc_list)} documents from {VIDEO_METADATA_COLLECTION} collection")
+
+    if doc_list:
+        sample_doc = doc_list[0].to_dict()
+        logging.info(f"Sample document fields: {', '.join(sample_doc.keys())}")
+
+    if args.write:
+        # Test a simple write operation (to a test document)
+        db.collection('script_tests').document('test_doc').set({
+            'test_timestamp': server_timestamp(),
+            'test_message': 'Connection is working'
+        })
+        logging.info("Successfully wrote test document")
+
+    print("Firebase connection test completed successfully")
+    return 0
@@ -0,0 +1,97 @@
+"""``download``: télécharge les images des vidéos listées dans video_details.csv."""
+import csv
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pipeline import resilience
+
+
+def _fetch(image_url):
+    import requests
+
+    response = requests.get(image_url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+def download_image(image_url, output_path, max_retries=None):
+    """Télécharge une image; les erreurs passagères (429, 5xx, coupures) sont réessayées."""
+    try:
+        content = resilience.call(lambda: _fetch(image_url), description=image_url,
+                                  backend='http', max_attempts=max_retries)
+    except Exception as e:
+        logging.error(f"Échec du téléchargement de {image_url}: {e}")
+        return False
+
+    with open(output_path, 'wb') as f:
+        f.write(content)
+    return True
+
+
+def image_path_for(video, base_path):
+    """Chemin local de l'image d'une vidéo: <plan>/<jour>/images/<id>.<ext>."""
+    video_id = video['videoId'].replace('_text', '')  # Nettoyer l'ID
+    image_extension = video['videoImg'].split('.')[-1]
+    return Path(base_path) / str(video['plan_id']) / video['day_name'] / "images" / f"{video_id}.{image_extension}"
+
+
+def _process_video(video, base_path):
+    """Télécharge l'image d'une vidéo si besoin; False si elle n'a pas pu l'être."""
+    try:
+        image_path = image_path_for(video, base_path)
+        image_path.parent.mkdir(exist_ok=True, parents=True)
+
+        # Télécharger l'image si elle n'existe pas
+        if not image_path.exists():
+            logging.info(f"Téléchargement de l'image pour la vidéo {image_path.stem}")
+            ok = download_image(video['videoImg'], image_path)
+            if ok:
+                logging.info(f"Image téléchargée: {image_path.name}")
+
+            # Pause aléatoire entre les téléchargements
+            time.sleep(random.uniform(0.5, 1.5))
+            return ok
+
+        logging.info(f"Image déjà existante: {image_path.name}")
+        return True
+
+    except Exception as e:
+        logging.error(f"Erreur lors du traitement de l'image {video.get('videoId', 'unknown')}: {e}")
+        return False
+
+
+def process_images(csv_path, base_path="downloaded_videos", workers=1):
+    """Traite et télécharge les images pour chaque vidéo, avec ``workers`` téléchargements en parallèle.
+
+    Les workers partagent le disjoncteur ``http``: si le stockage renvoie des
+    erreurs en série, tout le pool se met en pause au lieu d'insister.
+    Renvoie ``(traitées, échecs)``.
+    """
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        videos = list(csv.DictReader(f))
+
+    total_images = len(videos)
+    processed_images = 0
+    failed_images = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ok in pool.map(lambda video: _process_video(video, base_path), videos):
+            if not ok:
+                failed_images += 1
+                continue
+            processed_images += 1
+            progress = (processed_images / total_images) * 100
+            logging.info(f"Progression globale: {progress:.1f}% ({processed_images}/{total_images})")
+
+    logging.info(f"Téléchargement des images terminé. Total traité: {processed_images}/{total_images}")
+    if failed_images:
+        logging.error(f"{failed_images} image(s) n'ont pas pu être téléchargées")
+    return processed_images, failed_images
+
+
+def run(args):
+    _, failed_images = process_images(args.csv, args.output_dir, args.workers)
+    return 1 if failed_images else 0
@@ -0,0 +1,498 @@
+"""In-memory stand-in for the subset of the Firestore client the pipeline uses.
+
+Covers ``collection().document()`` get/set/update/delete, ``list_documents``,
+``get``/``stream`` with ``where``/``order_by``/``limit`` on collections, write
+batches and ``get_all``.
+Documents are stored as plain dicts, so benchmarks and local runs never touch
+the production project::
+
+    from pipeline.fake_firestore import FakeFirestore
+
+    db = FakeFirestore()
+    upload_catalog(db, df, pause=0, progress=False)
+
+``FaultyFirestore`` adds latency, quotas and injected gRPC-style errors for
+load testing the writers (see ``pipeline.load_test``).
+"""
+import bisect
+import copy
+import datetime
+import math
+import random
+import threading
+import time
+
+MAX_BATCH_WRITES = 500
+
+
+class FakeFirestoreError(Exception):
+    """Base class; ``code`` mirrors the gRPC status name."""
+
+    code = 'UNKNOWN'
+
+
+class NotFound(FakeFirestoreError):
+    code = 'NOT_FOUND'
+
+
+class InvalidArgument(FakeFirestoreError):
+    code = 'INVALID_ARGUMENT'
+
+
+def _server_timestamp_sentinel():
+    try:
+        from google.cloud.firestore import SERVER_TIMESTAMP
+    except ImportError:
+        return None
+    return SERVER_TIMESTAMP
+
+
+_SERVER_TIMESTAMP = _server_timestamp_sentinel()
+
+
+_SCALARS = (str, int, float, bool, type(None), datetime.datetime)
+
+
+def _copy(data):
+    """Copy a document dict; only nested containers need a deep copy."""
+    if data is None:
+        return None
+    return {k: v if isinstance(v, _SCALARS) else copy.deepcopy(v) for k, v in data.items()}
+
+
+def _check_no_nested_arrays(value, path='', in_array=False):
+    """Firestore rejects an array directly inside another array."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _check_no_nested_arrays(item, f"{path}.{key}" if path else key)
+    elif isinstance(value, (list, tuple)):
+        if in_array:
+            raise InvalidArgument(f"Cannot have nested arrays (field {path})")
+        for item in value:
+            _check_no_nested_arrays(item, path, in_array=True)
+
+
+def _resolve(data):
+    """Copy ``data``, replacing the server timestamp sentinel with the current time."""
+    resolved = _copy(data)
+    if _SERVER_TIMESTAMP is not None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for key, value in data.items():
+            if value is _SERVER_TIMESTAMP:
+                resolved[key] = now
+    return resolved
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self._data = data
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return _copy(self._data)
+
+    def get(self, field_path):
+        return self._data[field_path]
+
+
+class FakeDocumentReference:
+    def __init__(self, client, collection_id, document_id):
+        self._client = client
+        self.collection_id = collection_id
+        self.id = document_id
+
+    @property
+    def path(self):
+        return f'{self.collection_id}/{self.id}'
+
+    def get(self, field_paths=None):
+        self._client._rpc('get')
+        return self._client._read(self, field_paths)
+
+    def set(self, document_data, merge=False, retry=None, timeout=None):
+        _check_no_nested_arrays(document_data)
+        self._client._commit([('set', self, document_data, merge)])
+
+    def update(self, field_updates, retry=None, timeout=None):
+        _check_no_nested_arrays(field_updates)
+        self._client._commit([('update', self, field_updates, False)])
+
+    def delete(self):
+        self._client._commit([('delete', self, None, False)])
+
+
+_OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class FakeQuery:
+    def __init__(self, collection, limit=None, filters=(), order=None):
+        self._collection = collection
+        self._limit = limit
+        self._filters = tuple(filters)
+        self._order = order
+
+    def limit(self, count):
+        return FakeQuery(self._collection, count, self._filters, self._order)
+
+    def where(self, field_path, op_string, value):
+        if op_string not in _OPERATORS:
+            raise InvalidArgument(f"Unsupported operator {op_string!r}")
+        return FakeQuery(self._collection, self._limit,
+                         self._filters + ((field_path, op_string, value),), self._order)
+
+    def order_by(self, field_path, direction='ASCENDING'):
+        return FakeQuery(self._collection, self._limit, self._filters, (field_path, direction))
+
+    def _matches(self, data):
+        for field_path, op_string, value in self._filters:
+            # Like Firestore, documents without the field never match
+            if field_path not in data or not _OPERATORS[op_string](data[field_path], value):
+                return False
+        return True
+
+    def stream(self):
+        client = self._collection._client
+        snapshots = [client._read(self._collection.document(doc_id))
+                     for doc_id in client._document_ids(self._collection.id)]
+        snapshots = [s for s in snapshots if s.exists and self._matches(s._data)]
+        if self._order is not None:
+            field_path, direction = self._order
+            snapshots = [s for s in snapshots if field_path in s._data]
+            snapshots.sort(key=lambda s: s._data[field_path], reverse=direction == 'DESCENDING')
+        if self._limit is not None:
+            snapshots = snapshots[:self._limit]
+        # Billed per document returned, and one read for an empty result
+        client._rpc('query', max(1, len(snapshots)))
+        yield from snapshots
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client, collection_id):
+        self._client = client
+        self.id = collection_id
+        super().__init__(self)
+
+    def document(self, document_id):
+        return FakeDocumentReference(self._client, self.id, document_id)
+
+    def list_documents(self):
+        references = [self.document(doc_id) for doc_id in self._client._document_ids(self.id)]
+        self._client._rpc('list_documents', max(1, len(references)))
+        return references
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def __len__(self):
+        return len(self._writes)
+
+    def set(self, reference, document_data, merge=False):
+        _check_no_nested_arrays(document_data)
+        self._writes.append(('set', reference, document_data, merge))
+
+    def update(self, reference, field_updates):
+        _check_no_nested_arrays(field_updates)
+        self._writes.append(('update', reference, field_updates, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self, retry=None, timeout=None):
+        if len(self._writes) > MAX_BATCH_WRITES:
+            raise InvalidArgument(f"maximum {MAX_BATCH_WRITES} writes allowed per request")
+        self._client._commit(self._writes)
+        self._writes = []
+
+
+class FakeFirestore:
+    """Thread-safe in-memory client; ``collections`` maps id -> {doc_id: data}."""
+
+    def __init__(self):
+        self.collections = {}
+        self._lock = threading.Lock()
+
+    def collection(self, collection_id):
+        return FakeCollectionReference(self, collection_id)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def get_all(self, references, field_paths=None):
+        references = list(references)
+        self._rpc('get_all', len(references))
+        for reference in references:
+            yield self._read(reference, field_paths)
+
+    def _rpc(self, method, units=1, keys=None):
+        """Called once per simulated round trip; see ``FaultyFirestore``.
+
+        ``keys`` lists the ``(collection_id, document_id)`` pairs a commit writes.
+        """
+
+    def _document_ids(self, collection_id):
+        with self._lock:
+            return sorted(self.collections.get(collection_id, {}))
+
+    def _read(self, reference, field_paths=None):
+        with self._lock:
+            data = self.collections.get(reference.collection_id, {}).get(reference.id)
+            if data is not None and field_paths is not None:
+                data = {k: v for k, v in data.items() if k in field_paths}
+            return FakeDocumentSnapshot(reference, _copy(data))
+
+    def _commit(self, writes):
+        """Apply ``writes`` atomically: either all of them or none."""
+        self._rpc('commit', len(writes), [(reference.collection_id, reference.id) for _, reference, _, _ in writes])
+        with self._lock:
+            exists = {}
+            for op, reference, data, _ in writes:
+                key = reference.path
+                if key not in exists:
+                    exists[key] = reference.id in self.collections.get(reference.collection_id, {})
+                if op == 'update' and not exists[key]:
+                    raise NotFound(f"No document to update: {key}")
+                exists[key] = op != 'delete'
+
+            for op, reference, data, merge in writes:
+                documents = self.collections.setdefault(reference.collection_id, {})
+                if op == 'delete':
+                    documents.pop(reference.id, None)
+                elif op == 'set' and not merge:
+                    documents[reference.id] = _resolve(data)
+                else:
+                    documents.setdefault(reference.id, {}).update(_resolve(data))
+
+
+class ResourceExhausted(FakeFirestoreError):
+    code = 'RESOURCE_EXHAUSTED'
+
+
+class DeadlineExceeded(FakeFirestoreError):
+    code = 'DEADLINE_EXCEEDED'
+
+
+class Aborted(FakeFirestoreError):
+    code = 'ABORTED'
+
+
+class Unavailable(FakeFirestoreError):
+    code = 'UNAVAILABLE'
+
+
+INJECTABLE_ERRORS = {cls.code: cls for cls in (ResourceExhausted, DeadlineExceeded, Aborted, Unavailable)}
+
+
+class Latency:
+    """Per-call latency distribution in milliseconds.
+
+    ``Latency.parse`` accepts ``none``, ``const:MS``, ``uniform:LO,HI`` and
+    ``lognormal:MEDIAN,SIGMA``. ``per_unit_ms`` is added for every document
+    in the call (batch writes, ``get_all``), and ``spike_rate``/``spike_ms``
+    add an occasional slow call to model tail latency.
+    """
+
+    KINDS = ('none', 'const', 'uniform', 'lognormal')
+
+    def __init__(self, kind='none', a=0.0, b=0.0, per_unit_ms=0.0, spike_rate=0.0, spike_ms=0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency kind {kind!r} (choose from {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self.per_unit_ms = per_unit_ms
+        self.spike_rate = spike_rate
+        self.spike_ms = spike_ms
+
+    @classmethod
+    def parse(cls, spec, **kwargs):
+        kind, _, params = spec.partition(':')
+        values = [float(v) for v in params.split(',') if v]
+        return cls(kind, *values, **kwargs)
+
+    def sample(self, rng, units=1):
+        """Latency of one call, in seconds."""
+        if self.kind == 'const':
+            ms = self.a
+        elif self.kind == 'uniform':
+            ms = rng.uniform(self.a, self.b)
+        elif self.kind == 'lognormal':
+            ms = self.a * math.exp(rng.gauss(0, self.b))
+        else:
+            ms = 0.0
+        ms += self.per_unit_ms * units
+        if self.spike_rate and rng.random() < self.spike_rate:
+            ms += self.spike_ms
+        return ms / 1000.0
+
+
+def key_range_splits(keys, count):
+    """Split points cutting the sorted distinct ``keys`` into ``count`` equal spans."""
+    keys = sorted(set(map(str, keys)))
+    count = max(1, min(count, len(keys)))
+    return [keys[i * len(keys) // count] for i in range(1, count)]
+
+
+class FaultyFirestore(FakeFirestore):
+    """``FakeFirestore`` that behaves like a loaded backend.
+
+    Every round trip (a document get, a query, ``get_all``, a single write or
+    a batch commit) sleeps for a latency drawn from ``latency`` (one
+    ``Latency`` or a ``{method: Latency}`` dict, ``'default'`` as fallback),
+    and may fail with:
+
+    - an injected error, drawn from ``error_rates`` (``{'ABORTED': 0.01}``);
+    - ``RESOURCE_EXHAUSTED`` when ``writes_per_second``/``reads_per_second``
+      document quotas (token buckets with one second of burst) are in debt;
+      a call larger than the quota is admitted and paid back by later ones.
+      Queries and ``list_documents`` count the documents they return (at
+      least one), as Firestore bills them;
+    - ``DEADLINE_EXCEEDED`` when the drawn latency exceeds ``deadline``.
+
+    With ``range_writes_per_second`` set, writes also queue per key range, as
+    one tablet serves a contiguous span of sorted document IDs. The ranges
+    are cut at the sorted ``range_splits`` keys (see ``key_range_splits``;
+    without them each collection is a single range). Each range applies
+    that many writes per second, and a commit waits for the busiest range it
+    touches. That is what makes writing sequential IDs slower than spreading
+    them out.
+
+    Failures happen before anything is applied, so a failed commit writes
+    nothing. All draws come from one seeded RNG, and every call is recorded
+    in ``calls`` for ``summary()``.
+    """
+
+    READ_METHODS = ('get', 'get_all', 'query', 'list_documents')
+
+    def __init__(self, latency=None, error_rates=None, writes_per_second=None,
+                 reads_per_second=None, deadline=None, range_writes_per_second=None,
+                 range_splits=(), seed=0, sleep=time.sleep):
+        super().__init__()
+        self.latency = latency or Latency()
+        self.error_rates = dict(error_rates or {})
+        unknown = set(self.error_rates) - set(INJECTABLE_ERRORS)
+        if unknown:
+            raise ValueError(f"Cannot inject {', '.join(sorted(unknown))}; "
+                             f"choose from {', '.join(INJECTABLE_ERRORS)}")
+        self.deadline = deadline
+        self.range_writes_per_second = range_writes_per_second
+        self.range_splits = sorted(range_splits)
+        self._range_busy_until = {}
+        self.calls = []
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._fault_lock = threading.Lock()
+        self._buckets = {}
+        for kind, rate in (('write', writes_per_second), ('read', reads_per_second)):
+            if rate:
+                self._buckets[kind] = [float(rate), float(rate), time.monotonic()]
+
+    def _latency_for(self, method):
+        if isinstance(self.latency, Latency):
+            return self.latency
+        return self.latency.get(method) or self.latency.get('default') or Latency()
+
+    def _take_tokens(self, kind, units):
+        """Admit a call while the bucket isn't in debt; it may then go negative.
+
+        A commit larger than the per-second quota still goes through, and
+        later calls are refused until the refill has paid it back, so the
+        sustained rate stays at the quota.
+        """
+        bucket = self._buckets.get(kind)
+        if bucket is None:
+            return True
+        rate, tokens, last = bucket
+        now = time.monotonic()
+        tokens = min(rate, tokens + (now - last) * rate)
+        allowed = tokens > 0
+        bucket[1] = tokens - units if allowed else tokens
+        bucket[2] = now
+        return allowed
+
+    def _range_wait(self, keys):
+        """Queue ``keys`` on their key ranges; seconds until the busiest one is done."""
+        now = time.monotonic()
+        counts = {}
+        for collection_id, doc_id in keys:
+            key_range = (collection_id, bisect.bisect_right(self.range_splits, doc_id))
+            counts[key_range] = counts.get(key_range, 0) + 1
+        finish = now
+        for key_range, count in counts.items():
+            start = max(now, self._range_busy_until.get(key_range, now))
+            self._range_busy_until[key_range] = start + count / self.range_writes_per_second
+            finish = max(finish, self._range_busy_until[key_range])
+        return finish - now
+
+    def _rpc(self, method, units=1, keys=None):
+        with self._fault_lock:
+            delay = self._latency_for(method).sample(self._rng, units)
+            error = None
+            for code, rate in self.error_rates.items():
+                if self._rng.random() < rate:
+                    error = INJECTABLE_ERRORS[code](f"Injected {code} on {method}")
+                    break
+            kind = 'read' if method in self.READ_METHODS else 'write'
+            if error is None and not self._take_tokens(kind, units):
+                error = ResourceExhausted(f"Quota exceeded for {kind}s ({units} documents)")
+            if error is None and keys and self.range_writes_per_second:
+                delay += self._range_wait(keys)
+
+        if self.deadline is not None and delay > self.deadline:
+            delay = self.deadline
+            error = DeadlineExceeded(f"Deadline of {self.deadline}s exceeded on {method}")
+
+        if delay:
+            self._sleep(delay)
+        with self._fault_lock:
+            self.calls.append((method, units, delay, error.code if error else 'OK'))
+        if error is not None:
+            raise error
+
+    def summary(self):
+        """Per-method call counts, outcomes and latency percentiles (ms)."""
+        with self._fault_lock:
+            calls = list(self.calls)
+
+        methods = {}
+        for method, units, delay, outcome in calls:
+            entry = methods.setdefault(method, {'calls': 0, 'documents': 0, 'outcomes': {}, 'latencies': []})
+            entry['calls'] += 1
+            entry['documents'] += units
+            entry['outcomes'][outcome] = entry['outcomes'].get(outcome, 0) + 1
+            entry['latencies'].append(delay * 1000.0)
+
+        for entry in methods.values():
+            latencies = sorted(entry.pop('latencies'))
+            for name, q in (('p50_ms', 0.50), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+                entry[name] = round(percentile(latencies, q), 3)
+            entry['max_ms'] = round(latencies[-1], 3)
+        return methods
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[rank]
@@ -0,0 +1,116 @@
+"""Shared, cached Firestore client.
+
+The client is created once per process from the first matching source:
+
+1. ``FIRESTORE_EMULATOR_HOST`` (or ``--emulator``) - talk to a local emulator,
+   no credentials needed.
+2. ``--credentials`` / ``FITSAGA_CREDENTIALS`` / ``GOOGLE_APPLICATION_CREDENTIALS``
+   - a service account JSON file.
+3. ``scripts/credentials.json``.
+"""
+import datetime
+import logging
+import os
+import threading
+from functools import lru_cache
+
+from pipeline import paths
+
+DEFAULT_PROJECT = 'saga-fitness'
+
+_settings = {
+    'credentials': None,
+    'emulator_host': None,
+    'project': None,
+}
+
+# lru_cache doesn't stop two threads from running get_db at once, and the
+# get_app/initialize_app check below must not interleave
+_client_lock = threading.Lock()
+
+
+def configure(credentials=None, emulator_host=None, project=None):
+    """Override the client settings; must be called before ``get_db``."""
+    if credentials:
+        _settings['credentials'] = str(credentials)
+    if emulator_host:
+        _settings['emulator_host'] = emulator_host
+    if project:
+        _settings['project'] = project
+    get_db.cache_clear()
+
+
+def credentials_path():
+    """Return the service account file the client will use."""
+    return (
+        _settings['credentials']
+        or os.environ.get('FITSAGA_CREDENTIALS')
+        or os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+        or str(paths.CREDENTIALS_JSON)
+    )
+
+
+def project_id():
+    return (
+        _settings['project']
+        or os.environ.get('FITSAGA_PROJECT_ID')
+        or os.environ.get('GCLOUD_PROJECT')
+        or DEFAULT_PROJECT
+    )
+
+
+def target():
+    """What ``get_db`` connects to: the emulator host, or the project and credentials file."""
+    emulator_host = _settings['emulator_host'] or os.environ.get('FIRESTORE_EMULATOR_HOST')
+    if emulator_host:
+        return {'emulator': emulator_host, 'project': project_id()}
+    return {'project': project_id(), 'credentials': os.path.abspath(credentials_path())}
+
+
+@lru_cache(maxsize=None)
+def get_db():
+    """Return the process-wide Firestore client, creating it on first use."""
+    with _client_lock:
+        return _create_client()
+
+
+def _create_client():
+    emulator_host = _settings['emulator_host'] or os.environ.get('FIRESTORE_EMULATOR_HOST')
+    if emulator_host:
+        # The emulator accepts anonymous credentials, so skip firebase_admin
+        # entirely and build the client directly.
+        os.environ['FIRESTORE_EMULATOR_HOST'] = emulator_host
+        from google.cloud import firestore as gcloud_firestore
+
+        logging.info(f"Connecting to Firestore emulator at {emulator_host}")
+        return gcloud_firestore.Client(project=project_id())
+
+    import firebase_admin
+    from firebase_admin import credentials
+    from firebase_admin import firestore
+
+    cred_path = credentials_path()
+    if not os.path.exists(cred_path):
+        raise FileNotFoundError(f"Firebase credentials file not found: {cred_path}")
+
+    try:
+        app = firebase_admin.get_app()
+    except ValueError:
+        logging.info("Initializing Firebase connection...")
+        app = firebase_admin.initialize_app(credentials.Certificate(cred_path))
+
+    return firestore.client(app)
+
+
+def server_timestamp():
+    """Return the Firestore server timestamp sentinel.
+
+    Without google-cloud-firestore installed only the in-memory client can be
+    in use, so the local time is an exact substitute.
+    """
+    try:
+        from google.cloud.firestore import SERVER_TIMESTAMP
+    except ImportError:
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    return SERVER_TIMESTAMP
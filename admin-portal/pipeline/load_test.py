@@ -0,0 +1,131 @@
+"""``load-test``: run the real writers against a throttled, faulty Firestore.
+
+The synthetic catalog is written by the same functions production uses
+(``upload_catalog`` for ``sync``, ``update_thumbnail_urls`` for
+``update-thumbnails``), split across ``workers`` threads sharing one
+``FaultyFirestore``. The report has end-to-end throughput, how many rows
+made it, and per-RPC latency percentiles and outcomes.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import resilience
+from pipeline.catalog import VIDEO_METADATA_COLLECTION
+from pipeline.fake_firestore import FaultyFirestore, Latency, key_range_splits
+from pipeline.write_order import doc_ids, order_rows
+
+WRITERS = ('sync', 'update-thumbnails')
+
+
+def _chunks(df, count):
+    size = -(-len(df) // count)
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def _sync_writer(db, chunk, batch_size):
+    from pipeline.sync import upload_catalog
+
+    added, errors = upload_catalog(db, chunk, batch_size=batch_size, pause=0, progress=False)
+    return added, errors
+
+
+def _update_writer(db, chunk, batch_size):
+    from pipeline.merge import update_thumbnail_urls
+
+    stats = update_thumbnail_urls(db, chunk, batch_size=batch_size, update_pause=0,
+                                  batch_pause=0, progress=False)
+    return stats['updated'], stats['errors']
+
+
+def run_load_test(db, catalog, writer='sync', workers=1, batch_size=500, write_order='csv'):
+    """Write ``catalog`` through ``writer`` with ``workers`` threads; returns a report dict."""
+    catalog = order_rows(catalog, write_order)
+    if writer == 'update-thumbnails':
+        # update() needs existing documents, keyed by video ID as in production
+        catalog = catalog.rename(columns={'videoId_x': 'videoId'})
+        db.collections[VIDEO_METADATA_COLLECTION] = {
+            video_id: {'videoId': video_id, 'thumbnailUrl': ''} for video_id in catalog['videoId']
+        }
+        write = _update_writer
+    else:
+        write = _sync_writer
+
+    chunks = _chunks(catalog, workers)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda chunk: write(db, chunk, batch_size), chunks))
+    elapsed = time.perf_counter() - start
+
+    written = sum(r[0] for r in results)
+    return {
+        'writer': writer,
+        'workers': workers,
+        'write_order': write_order,
+        'rows': len(catalog),
+        'written': written,
+        'errors': sum(r[1] for r in results),
+        'elapsed_s': round(elapsed, 3),
+        'docs_per_sec': round(written / elapsed, 1) if elapsed else None,
+        'rpc': db.summary(),
+        'retries': resilience.stats(),
+    }
+
+
+def parse_error_rates(specs):
+    """``['ABORTED=0.01', ...]`` -> ``{'ABORTED': 0.01}``."""
+    rates = {}
+    for spec in specs or []:
+        code, _, rate = spec.partition('=')
+        rates[code.strip().upper()] = float(rate)
+    return rates
+
+
+def print_report(report):
+    print(f"{report['writer']} x{report['workers']} ({report['write_order']} order): {report['written']}/{report['rows']} rows written, "
+          f"{report['errors']} errors, {report['elapsed_s']}s, {report['docs_per_sec']} docs/s")
+    print(f"{'method':<15} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  outcomes")
+    for method, entry in sorted(report['rpc'].items()):
+        outcomes = ', '.join(f"{k}={v}" for k, v in sorted(entry['outcomes'].items()))
+        print(f"{method:<15} {entry['calls']:>7} {entry['p50_ms']:>9} {entry['p95_ms']:>9} "
+              f"{entry['p99_ms']:>9} {entry['max_ms']:>9}  {outcomes}")
+    for backend, counts in sorted(report.get('retries', {}).items()):
+        print(f"{backend}: " + ', '.join(f"{k}={v}" for k, v in counts.items()))
+
+
+def run(args):
+    from pipeline.bench import parse_size
+    from pipeline.synthetic import generate_catalog
+
+    catalog = generate_catalog(parse_size(args.rows), args.seed)
+    # The tablets of a loaded collection: equal spans of the IDs being written
+    keys = catalog['videoId_x'] if args.writer == 'update-thumbnails' else doc_ids(catalog)
+    latency = Latency.parse(args.latency, per_unit_ms=args.per_write_ms,
+                            spike_rate=args.spike_rate, spike_ms=args.spike_ms)
+    db = FaultyFirestore(
+        latency=latency,
+        error_rates=parse_error_rates(args.error),
+        writes_per_second=args.writes_per_second,
+        reads_per_second=args.reads_per_second,
+        deadline=args.deadline,
+        range_writes_per_second=args.range_writes_per_second,
+        range_splits=key_range_splits(keys, args.key_ranges),
+        seed=args.seed,
+    )
+
+    # The writers log every batch and error; only the report matters here
+    logging.disable(logging.ERROR)
+    try:
+        report = run_load_test(db, catalog, args.writer, args.workers, args.batch_size, args.write_order)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    report['config'] = {k: v for k, v in vars(args).items() if k not in ('handler',)}
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Wrote load test report to {args.output}")
+    return 0
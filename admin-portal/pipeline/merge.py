@@ -0,0 +1,179 @@
+"""Catalog merges.
+
+``join``: build merged_video_data.csv from video_details.csv and the Azure
+thumbnail results (formerly scripts/joinedmappedfile.py).
+
+``update-thumbnails``: push thumbnail URLs from the Azure results onto the
+existing videoMetadata documents (formerly merge_video_data_batched.py).
+"""
+import logging
+import os
+import time
+
+from pipeline import profiling, resilience
+from pipeline.catalog import VIDEO_METADATA_COLLECTION, clean_video_id, is_missing
+from pipeline.firebase import get_db, server_timestamp
+
+VIDEO_BASE_URL = 'https://sagafit.blob.core.windows.net/sagafitvideos/'
+
+
+def join_video_details(video_details, azure_thumbnails_result):
+    """Rename the scraped video_details columns and join the thumbnail results."""
+    import pandas as pd
+
+    with profiling.stage('normalize'):
+        video_details = video_details.copy()
+        azure_thumbnails_result = azure_thumbnails_result.copy()
+
+        # Delete _text from videoId, which is really the thumbnail ID
+        video_details['videoId'] = video_details['videoId'].str.replace('_text', '', regex=False)
+        video_details = video_details.rename(columns={
+            'videoId': 'thumbnailId',
+            'videovalue': 'videoId',
+            'videoactivity': 'activity',
+            'videotype': 'type',
+            'videodescription': 'bodypart',
+        })
+        video_details = video_details.drop(columns=['videoImg', 'plan_url'])
+
+        # Construct the new column "videourl"
+        video_details['videourl'] = VIDEO_BASE_URL + \
+            video_details['plan_id'].astype(str) + '/' + \
+            video_details['day_name'] + '/' + \
+            video_details['videoId']
+
+        # Ensure both 'thumbnailId' columns are the same data type (string)
+        video_details['thumbnailId'] = video_details['thumbnailId'].astype(str)
+        azure_thumbnails_result['thumbnailId'] = azure_thumbnails_result['thumbnailId'].astype(str)
+
+    with profiling.stage('merge'):
+        return pd.merge(video_details, azure_thumbnails_result, on='thumbnailId', how='inner')
+
+
+def merge_thumbnails(videos_df, thumbnails_df):
+    """Left-join thumbnail rows onto videos by normalized video ID."""
+    import pandas as pd
+
+    with profiling.stage('normalize'):
+        videos_df = videos_df.copy()
+        thumbnails_df = thumbnails_df.copy()
+        videos_df['clean_videoId'] = videos_df['videoId'].apply(clean_video_id)
+        thumbnails_df['clean_videoId'] = thumbnails_df['videoId'].apply(clean_video_id)
+
+    with profiling.stage('merge'):
+        return pd.merge(
+            videos_df,
+            thumbnails_df,
+            on='clean_videoId',
+            how='left',
+            suffixes=('', '_thumbnail')
+        )
+
+
+def update_thumbnail_urls(db, final_df, batch_size=20, update_pause=0.1, batch_pause=2.0,
+                          collection=VIDEO_METADATA_COLLECTION, last_updated=None, progress=True):
+    """Update ``thumbnailUrl`` (and ``lastUpdated``) on each video document; returns a stats dict."""
+    from tqdm import tqdm
+
+    if last_updated is None:
+        last_updated = server_timestamp()
+
+    stats = {'updated': 0, 'missing': 0, 'errors': 0}
+    total_videos = len(final_df)
+    total_batches = (total_videos - 1) // batch_size + 1 if total_videos else 0
+
+    logging.info(f"Starting to process {total_videos} videos in {total_batches} batches (batch size: {batch_size})")
+
+    with tqdm(total=total_videos, desc="Overall Progress", disable=not progress) as pbar:
+        for batch_start in range(0, total_videos, batch_size):
+            batch_end = min(batch_start + batch_size, total_videos)
+            batch_num = batch_start // batch_size + 1
+            logging.info(f"BATCH {batch_num}/{total_batches} (videos {batch_start+1}-{batch_end})")
+
+            batch_df = final_df.iloc[batch_start:batch_end]
+            batch_start_time = time.time()
+
+            for index, row in batch_df.iterrows():
+                document_id = row['videoId']
+                thumbnail_url = row.get('thumbnailUrl', '')
+                if is_missing(thumbnail_url):
+                    logging.warning(f"No thumbnail URL found for video {document_id}")
+                    stats['missing'] += 1
+                    # Still update to ensure we're setting empty string
+                    thumbnail_url = ''
+
+                start_time = time.time()
+                doc_ref = db.collection(collection).document(document_id)
+                try:
+                    with profiling.stage('commit'):
+                        # lastUpdated lets the replica pick the change up incrementally
+                        resilience.call(lambda: doc_ref.update({'thumbnailUrl': thumbnail_url,
+                                                                'lastUpdated': last_updated},
+                                                               **resilience.rpc_options()),
+                                        description=f"update of {document_id}")
+                except Exception as e:
+                    logging.error(f"Error updating video {document_id}: {str(e)}")
+                    stats['errors'] += 1
+                    continue
+
+                elapsed = time.time() - start_time
+                if elapsed > 2:
+                    logging.warning(f"Update for {document_id} took {elapsed:.2f} seconds")
+                stats['updated'] += 1
+
+                # Add a small delay between updates to avoid overwhelming Firebase
+                time.sleep(update_pause)
+
+            logging.info(f"Batch {batch_num} completed in {time.time() - batch_start_time:.2f} seconds")
+            logging.info(f"Running totals: {stats['updated']} updated, {stats['missing']} missing thumbnails, {stats['errors']} errors")
+            pbar.update(len(batch_df))
+
+            if batch_end < total_videos:
+                time.sleep(batch_pause)
+
+    return stats
+
+
+def run_join(args):
+    import pandas as pd
+
+    with profiling.stage('load'):
+        video_details = pd.read_csv(args.video_details)
+        azure_thumbnails_result = pd.read_csv(args.thumbnails)
+
+    merged_df = join_video_details(video_details, azure_thumbnails_result)
+    with profiling.stage('write'):
+        merged_df.to_csv(args.output, index=False)
+
+    logging.info(f"Wrote {len(merged_df)} rows to {args.output}")
+    print(merged_df.head())
+    return 0
+
+
+def run_update_thumbnails(args):
+    import pandas as pd
+
+    for path in (args.videos, args.thumbnails):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found")
+
+    logging.info("Reading CSV files...")
+    with profiling.stage('load'):
+        videos_df = pd.read_csv(args.videos)
+        thumbnails_df = pd.read_csv(args.thumbnails)
+    logging.info(f"Loaded {len(videos_df)} videos and {len(thumbnails_df)} thumbnails")
+
+    final_df = merge_thumbnails(videos_df, thumbnails_df)
+    missing_thumbnails = final_df['thumbnailUrl'].isna().sum()
+    logging.info(f"Merged dataframe has {len(final_df)} rows")
+    logging.info(f"Number of rows with empty thumbnailUrl: {missing_thumbnails}")
+
+    stats = update_thumbnail_urls(get_db(), final_df, batch_size=args.batch_size,
+                                  batch_pause=args.batch_pause)
+
+    logging.info("Final statistics:")
+    logging.info(f"- Total videos processed: {len(final_df)}")
+    logging.info(f"- Successfully updated: {stats['updated']}")
+    logging.info(f"- Videos missing thumbnails: {stats['missing']}")
+    logging.info(f"- Errors encountered: {stats['errors']}")
+    return 0 if stats['errors'] == 0 else 1
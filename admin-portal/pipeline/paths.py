@@ -0,0 +1,14 @@
+"""Default locations of the catalog files, relative to ``admin-portal``."""
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = BASE_DIR / 'scripts'
+
+CREDENTIALS_JSON = SCRIPTS_DIR / 'credentials.json'
+VIDEO_DETAILS_CSV = SCRIPTS_DIR / 'video_details.csv'
+VIDEO_DETAILS_MODIFIED_CSV = SCRIPTS_DIR / 'video_details_modified.csv'
+THUMBNAILS_CSV = BASE_DIR / 'azure-thumbnails-result.csv'
+MERGED_CSV = BASE_DIR / 'merged_video_data.csv'
+COMPLETE_METADATA_CSV = BASE_DIR / 'complete-metadata.csv'
+REPLICA_DB = BASE_DIR / 'video_metadata_replica.sqlite'
+RUN_STATE = BASE_DIR / '.pipeline-state.json'
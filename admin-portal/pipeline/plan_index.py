@@ -0,0 +1,177 @@
+"""``plan-index``: precomputed plan -> days -> videos documents.
+
+The app shows a plan by listing its days and their videos. Reading that from
+the flat videoMetadata collection means a query per plan and grouping on the
+client, so this stage writes one ``planIndex/<planId>`` document per plan with
+everything the listing needs, in plan order::
+
+    {
+      'planId': '9829516',
+      'dayCount': 2,
+      'videoCount': 14,
+      'days': [
+        {'dayId': '18220897', 'dayName': 'día 1', 'videos': [
+          {'docId': '9829516_18220897_2023_cw003.mp4', 'videoId': '2023_cw003.mp4',
+           'activity': 'Jumping jacks', 'type': 'cardio', 'bodypart': '...',
+           'thumbnailUrl': '...', 'videoUrl': '...'},
+          ...
+        ]},
+        ...
+      ],
+      'contentHash': '<sha256 of the fields above>',
+      'lastUpdated': SERVER_TIMESTAMP,
+    }
+
+Only plans whose ``contentHash`` differs from the stored one are written.
+"""
+import csv
+import hashlib
+import json
+import logging
+
+from pipeline import profiling, resilience
+from pipeline.catalog import check_columns, video_doc_id
+from pipeline.firebase import get_db, server_timestamp
+
+PLAN_INDEX_COLLECTION = 'planIndex'
+BATCH_SIZE = 500
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def build_plan_indexes(rows):
+    """Group catalog rows into plan index documents in a single pass.
+
+    ``rows`` is an iterable of merged catalog rows (dicts). Days and videos keep
+    the order in which they first appear in the catalog, which is the order of
+    the original workout plan. Returns ``{plan_id: document}``; documents carry
+    their ``contentHash`` but not ``lastUpdated``.
+    """
+    plans = {}
+    days_by_plan = {}
+
+    for row in rows:
+        plan_id = _text(row['plan_id'])
+        day_id = _text(row['day_id'])
+
+        plan = plans.get(plan_id)
+        if plan is None:
+            plan = plans[plan_id] = {'planId': plan_id, 'days': []}
+            days_by_plan[plan_id] = {}
+
+        day = days_by_plan[plan_id].get(day_id)
+        if day is None:
+            day = days_by_plan[plan_id][day_id] = {
+                'dayId': day_id,
+                'dayName': _text(row.get('day_name') or row.get('dayName')),
+                'videos': [],
+            }
+            plan['days'].append(day)
+
+        day['videos'].append({
+            'docId': video_doc_id(row),
+            'videoId': _text(row['videoId_x']),
+            'activity': _text(row['activity']),
+            'type': _text(row['type']),
+            'bodypart': _text(row['bodypart']),
+            'thumbnailUrl': _text(row['thumbnailUrl']),
+            'videoUrl': _text(row['videourl']),
+        })
+
+    for plan in plans.values():
+        plan['dayCount'] = len(plan['days'])
+        plan['videoCount'] = sum(len(day['videos']) for day in plan['days'])
+        plan['contentHash'] = content_hash(plan)
+
+    return plans
+
+
+def content_hash(index_doc):
+    """Stable hash of an index document's content fields."""
+    content = {k: v for k, v in index_doc.items() if k not in ('contentHash', 'lastUpdated')}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def read_catalog_rows(csv_path):
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        check_columns(reader.fieldnames or [])
+        return list(reader)
+
+
+def fetch_stored_hashes(db, plan_ids, collection=PLAN_INDEX_COLLECTION):
+    """Return ``{plan_id: contentHash}`` for the index documents that exist."""
+    refs = [db.collection(collection).document(plan_id) for plan_id in plan_ids]
+    stored = {}
+    if not refs:
+        return stored
+    for snapshot in db.get_all(refs, field_paths=['contentHash']):
+        if snapshot.exists:
+            stored[snapshot.id] = (snapshot.to_dict() or {}).get('contentHash')
+    return stored
+
+
+def changed_plans(indexes, stored_hashes):
+    """Plan IDs whose computed hash differs from the stored one."""
+    return [plan_id for plan_id, doc in indexes.items()
+            if stored_hashes.get(plan_id) != doc['contentHash']]
+
+
+def upload_plan_indexes(db, indexes, collection=PLAN_INDEX_COLLECTION, force=False,
+                        prune=False, dry_run=False, batch_size=BATCH_SIZE):
+    """Write changed plan index documents; returns a stats dict."""
+    stored_hashes = {} if force else fetch_stored_hashes(db, indexes.keys(), collection)
+    to_write = list(indexes) if force else changed_plans(indexes, stored_hashes)
+
+    stale = []
+    if prune:
+        stale = [ref.id for ref in db.collection(collection).list_documents()
+                 if ref.id not in indexes]
+
+    stats = {'plans': len(indexes), 'written': 0, 'deleted': 0,
+             'unchanged': len(indexes) - len(to_write)}
+    logging.info(f"{len(indexes)} plans, {len(to_write)} changed, {len(stale)} stale")
+    if dry_run:
+        return stats
+
+    last_updated = server_timestamp()
+    ops = [('set', plan_id) for plan_id in to_write] + [('delete', plan_id) for plan_id in stale]
+    for i in range(0, len(ops), batch_size):
+        chunk = ops[i:i + batch_size]
+        batch = db.batch()
+        for op, plan_id in chunk:
+            ref = db.collection(collection).document(plan_id)
+            if op == 'set':
+                batch.set(ref, dict(indexes[plan_id], lastUpdated=last_updated))
+            else:
+                batch.delete(ref)
+        with profiling.stage('commit'):
+            resilience.commit(batch, description=f"commit of {len(chunk)} plan indexes")
+
+    stats['written'] = len(to_write)
+    stats['deleted'] = len(stale)
+    return stats
+
+
+def run(args):
+    with profiling.stage('load'):
+        rows = read_catalog_rows(args.csv)
+    with profiling.stage('build'):
+        indexes = build_plan_indexes(rows)
+    logging.info(f"Built {len(indexes)} plan indexes from {len(rows)} catalog rows")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(indexes, f, ensure_ascii=False, indent=2)
+        logging.info(f"Wrote plan indexes to {args.output}")
+    if args.no_upload:
+        return 0
+
+    stats = upload_plan_indexes(get_db(), indexes, force=args.force, prune=args.prune,
+                                dry_run=args.dry_run)
+    logging.info(f"Plan indexes: {stats['written']} written, {stats['unchanged']} unchanged, "
+                 f"{stats['deleted']} deleted")
+    return 0
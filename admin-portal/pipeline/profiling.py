@@ -0,0 +1,150 @@
+"""Per-stage wall/CPU/memory profiling, enabled with ``--profile``.
+
+Commands wrap their named steps (``load``, ``normalize``, ``merge``,
+``validate``, ``build_payloads``, ``commit``, ...) in ``stage()``::
+
+    from pipeline import profiling
+
+    with profiling.stage('load'):
+        df = pd.read_csv(csv_path)
+
+When profiling is off ``stage()`` does nothing. When it is on, each stage
+records wall time, CPU time (``time.process_time``, all threads), the peak
+memory traced by tracemalloc while it ran, and the change in resident set
+size. Repeated stages (one ``commit`` per batch) are aggregated by name, and
+``print_summary`` prints a table when the command ends. With
+``--profile-dir`` top-level stages on the main thread also run under one
+cProfile profiler per stage name, dumped once at the end to
+``<dir>/<n>-<stage>.prof`` for ``snakeviz``/``pstats``.
+
+Stages may run in worker threads (``load-test``, ``download --workers``).
+Their timings are recorded per call, but CPU time and traced memory are
+process-wide, so overlapping stages share the same peak.
+"""
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+_state = {
+    'enabled': False,
+    'cprofile_dir': None,
+    'active': [],       # [stage name, peak traced bytes so far] of the stages currently running
+    'records': {},      # stage name -> aggregated totals, in first-seen order
+    'profilers': {},    # stage name -> cProfile.Profile, with --profile-dir
+}
+_lock = threading.Lock()
+_local = threading.local()  # per-thread stage nesting depth
+
+
+def configure(enabled=True, cprofile_dir=None):
+    _state['enabled'] = enabled
+    _state['cprofile_dir'] = Path(cprofile_dir) if cprofile_dir else None
+    _state['records'] = {}
+    _state['profilers'] = {}
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if _state['cprofile_dir']:
+        _state['cprofile_dir'].mkdir(parents=True, exist_ok=True)
+
+
+def is_enabled():
+    return _state['enabled']
+
+
+def rss_bytes():
+    """Current resident set size, or None where it can't be read."""
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _note_peak():
+    """Fold the tracemalloc peak into every running stage, then reset it; hold ``_lock``."""
+    peak = tracemalloc.get_traced_memory()[1]
+    for entry in _state['active']:
+        entry[1] = max(entry[1], peak)
+    tracemalloc.reset_peak()
+
+
+@contextmanager
+def stage(name):
+    if not _state['enabled']:
+        yield
+        return
+
+    with _lock:
+        _note_peak()
+        entry = [name, tracemalloc.get_traced_memory()[0]]
+        _state['active'].append(entry)
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+
+    profiler = None
+    if _state['cprofile_dir'] and depth == 0 and threading.current_thread() is threading.main_thread():
+        profiler = _state['profilers'].setdefault(name, cProfile.Profile())
+
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - wall_before
+        cpu = time.process_time() - cpu_before
+        rss_after = rss_bytes()
+        _local.depth = depth
+
+        with _lock:
+            _note_peak()
+            _state['active'] = [e for e in _state['active'] if e is not entry]
+            record = _state['records'].setdefault(name, {
+                'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_traced_bytes': 0, 'rss_delta_bytes': 0,
+            })
+            record['calls'] += 1
+            record['wall_s'] += wall
+            record['cpu_s'] += cpu
+            record['peak_traced_bytes'] = max(record['peak_traced_bytes'], entry[1])
+            if rss_before is not None and rss_after is not None:
+                record['rss_delta_bytes'] += rss_after - rss_before
+
+
+def records():
+    return dict(_state['records'])
+
+
+def print_summary():
+    if not _state['records']:
+        return
+    mib = 1024 * 1024
+    print(f"\n{'stage':<16} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'peak MiB':>9} {'rss Δ MiB':>10}")
+    for name, r in _state['records'].items():
+        print(f"{name:<16} {r['calls']:>6} {r['wall_s']:>9.3f} {r['cpu_s']:>9.3f} "
+              f"{r['peak_traced_bytes'] / mib:>9.1f} {r['rss_delta_bytes'] / mib:>10.1f}")
+
+    if _state['cprofile_dir']:
+        for n, (name, profiler) in enumerate(_state['profilers'].items(), 1):
+            path = _state['cprofile_dir'] / f"{n:02d}-{name}.prof"
+            profiler.dump_stats(path)
+            logging.debug(f"cProfile stats for {name} written to {path}")
+        summary_path = _state['cprofile_dir'] / 'summary.json'
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(_state['records'], f, indent=2)
+        print(f"cProfile dumps and summary.json in {_state['cprofile_dir']}")
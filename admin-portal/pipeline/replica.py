@@ -0,0 +1,277 @@
+"""``replica``: local SQLite mirror of the videoMetadata collection.
+
+The first run downloads the whole collection once. Later runs only fetch
+documents whose ``lastUpdated`` is newer than the newest one already
+mirrored (``sync`` and ``update-thumbnails`` set it on every write; a change
+made elsewhere without it needs ``--full``), or, with ``--watch``, keep the
+mirror current from a snapshot listener. Deletions are only seen by the
+listener or a ``--full`` reload, which ``sync`` makes necessary anyway.
+
+Reports read the mirror through ``ReplicaClient``, which answers the read
+calls ``verify`` and ``check-thumbnails`` make (``collection().get()``,
+``list_documents()``, ``document().get()``) from SQLite, so repeated reports
+cost no Firestore reads::
+
+    python -m pipeline replica                 # initial load, then incremental
+    python -m pipeline check-thumbnails --replica
+    python -m pipeline replica --sql "SELECT plan_id, COUNT(*) FROM videos GROUP BY plan_id"
+"""
+import datetime
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from pipeline import paths
+from pipeline.catalog import VIDEO_METADATA_COLLECTION, is_missing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    doc_id        TEXT PRIMARY KEY,
+    plan_id       TEXT,
+    day_id        TEXT,
+    day_name      TEXT,
+    video_id      TEXT,
+    thumbnail_id  TEXT,
+    thumbnail_url TEXT,
+    video_url     TEXT,
+    activity      TEXT,
+    type          TEXT,
+    bodypart      TEXT,
+    last_updated  TEXT,
+    data          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_plan_id ON videos (plan_id);
+CREATE INDEX IF NOT EXISTS videos_day_id ON videos (day_id);
+CREATE INDEX IF NOT EXISTS videos_thumbnail_id ON videos (thumbnail_id);
+CREATE INDEX IF NOT EXISTS videos_video_id ON videos (video_id);
+CREATE INDEX IF NOT EXISTS videos_last_updated ON videos (last_updated);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# videos column -> videoMetadata field
+COLUMNS = {
+    'plan_id': 'planId',
+    'day_id': 'dayId',
+    'day_name': 'dayName',
+    'video_id': 'videoId',
+    'thumbnail_id': 'thumbnailId',
+    'thumbnail_url': 'thumbnailUrl',
+    'video_url': 'videoUrl',
+    'activity': 'activity',
+    'type': 'type',
+    'bodypart': 'bodypart',
+}
+
+_UPSERT = (
+    f"INSERT OR REPLACE INTO videos (doc_id, {', '.join(COLUMNS)}, last_updated, data) "
+    f"VALUES ({', '.join('?' * (len(COLUMNS) + 3))})"
+)
+
+
+def connect(db_path=None):
+    conn = sqlite3.connect(str(db_path or paths.REPLICA_DB), check_same_thread=False)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _timestamp(value):
+    """ISO-8601 UTC text for a Firestore timestamp, so SQLite orders it correctly."""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.astimezone(datetime.timezone.utc).isoformat()
+    return None if is_missing(value) else str(value)
+
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return _timestamp(value)
+    return str(value)
+
+
+def _row(doc_id, data):
+    values = [None if is_missing(data.get(field)) else str(data.get(field)) for field in COLUMNS.values()]
+    return (doc_id, *values, _timestamp(data.get('lastUpdated')),
+            json.dumps(data, default=_json_default, ensure_ascii=False))
+
+
+def get_state(conn, key):
+    row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_state(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def full_load(db, conn, collection=VIDEO_METADATA_COLLECTION):
+    """Replace the mirror with the whole collection; returns the document count."""
+    rows = [_row(doc.id, doc.to_dict() or {}) for doc in db.collection(collection).stream()]
+    with conn:
+        conn.execute("DELETE FROM videos")
+        conn.executemany(_UPSERT, rows)
+        _set_state(conn, 'last_full_load', _now())
+        _set_state(conn, 'last_sync', _now())
+    logging.info(f"Loaded {len(rows)} documents into the replica")
+    return len(rows)
+
+
+def high_water_mark(conn):
+    row = conn.execute("SELECT MAX(last_updated) FROM videos").fetchone()
+    return row[0] if row else None
+
+
+def poll_changes(db, conn, collection=VIDEO_METADATA_COLLECTION):
+    """Fetch documents updated after the newest mirrored ``lastUpdated``; returns the count."""
+    watermark = high_water_mark(conn)
+    if watermark is None:
+        return full_load(db, conn, collection)
+
+    since = datetime.datetime.fromisoformat(watermark)
+    query = db.collection(collection).where('lastUpdated', '>', since).order_by('lastUpdated')
+    rows = [_row(doc.id, doc.to_dict() or {}) for doc in query.stream()]
+    with conn:
+        conn.executemany(_UPSERT, rows)
+        _set_state(conn, 'last_sync', _now())
+    logging.info(f"Applied {len(rows)} changed documents (since {watermark})")
+    return len(rows)
+
+
+def watch(db, conn, collection=VIDEO_METADATA_COLLECTION, stop_event=None):
+    """Mirror changes from a snapshot listener until ``stop_event`` is set (or Ctrl-C).
+
+    The listener's first snapshot delivers every document, so this also
+    serves as the initial load: the mirror is emptied before it is applied,
+    dropping documents deleted while nothing was listening.
+    """
+    lock = threading.Lock()
+    first = [True]
+
+    def on_snapshot(_docs, changes, _read_time):
+        upserts = []
+        removed = []
+        for change in changes:
+            if change.type.name == 'REMOVED':
+                removed.append((change.document.id,))
+            else:
+                upserts.append(_row(change.document.id, change.document.to_dict() or {}))
+        with lock, conn:
+            if first[0]:
+                conn.execute("DELETE FROM videos")
+                first[0] = False
+            conn.executemany(_UPSERT, upserts)
+            conn.executemany("DELETE FROM videos WHERE doc_id = ?", removed)
+            _set_state(conn, 'last_sync', _now())
+        logging.info(f"Replica: {len(upserts)} upserted, {len(removed)} removed")
+
+    stop_event = stop_event or threading.Event()
+    watcher = db.collection(collection).on_snapshot(on_snapshot)
+    try:
+        while not stop_event.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.unsubscribe()
+
+
+class _ReplicaSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class _ReplicaDocument:
+    def __init__(self, conn, doc_id):
+        self._conn = conn
+        self.id = doc_id
+
+    def get(self):
+        row = self._conn.execute("SELECT data FROM videos WHERE doc_id = ?", (self.id,)).fetchone()
+        return _ReplicaSnapshot(self.id, json.loads(row[0]) if row else None)
+
+
+class _ReplicaCollection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def document(self, doc_id):
+        return _ReplicaDocument(self._conn, doc_id)
+
+    def list_documents(self):
+        return [_ReplicaDocument(self._conn, doc_id)
+                for (doc_id,) in self._conn.execute("SELECT doc_id FROM videos ORDER BY doc_id")]
+
+    def stream(self):
+        for doc_id, data in self._conn.execute("SELECT doc_id, data FROM videos ORDER BY doc_id"):
+            yield _ReplicaSnapshot(doc_id, json.loads(data))
+
+    def get(self):
+        return list(self.stream())
+
+
+class ReplicaClient:
+    """Read-only, Firestore-shaped view of the mirror (videoMetadata only)."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def collection(self, collection_id):
+        if collection_id != VIDEO_METADATA_COLLECTION:
+            raise ValueError(f"The replica only mirrors {VIDEO_METADATA_COLLECTION}, not {collection_id}")
+        return _ReplicaCollection(self._conn)
+
+
+def open_client(db_path=None):
+    """``ReplicaClient`` for an existing mirror; fails if it was never loaded."""
+    conn = connect(db_path)
+    last_sync = get_state(conn, 'last_sync')
+    if last_sync is None:
+        raise RuntimeError("The replica is empty; run 'python -m pipeline replica' first")
+    logging.info(f"Reading from the local replica (last synced {last_sync})")
+    return ReplicaClient(conn)
+
+
+def run(args):
+    from pipeline.firebase import get_db
+
+    conn = connect(args.db)
+
+    if args.sql:
+        cursor = conn.execute(args.sql)
+        print('\t'.join(col[0] for col in cursor.description or []))
+        for row in cursor:
+            print('\t'.join('' if v is None else str(v) for v in row))
+        return 0
+
+    db = get_db()
+    if args.watch:
+        watch(db, conn)
+        return 0
+
+    full = args.full
+    while True:
+        if full:
+            full_load(db, conn)
+        else:
+            poll_changes(db, conn)
+        if not args.poll_interval:
+            return 0
+        full = False
+        time.sleep(args.poll_interval)
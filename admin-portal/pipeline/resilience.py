@@ -0,0 +1,289 @@
+"""Shared retry, backoff and circuit-breaker policy for Firestore and HTTP calls.
+
+Every network call that may be repeated safely goes through ``call``::
+
+    from pipeline import resilience
+
+    resilience.commit(batch, description="commit of 500 documents")
+    doc_ref.update(fields, **resilience.rpc_options())   # inside resilience.call
+    content = resilience.call(lambda: fetch(url), description=url, backend='http')
+
+The Firestore client retries commits on its own by default, which would hide
+several attempts behind each of ours and bypass the budget and the breaker,
+so Firestore calls pass ``rpc_options()``: no client-side retry and a
+``rpc_timeout`` per attempt.
+
+Only transient failures are retried: gRPC ``UNAVAILABLE``, ``ABORTED``,
+``RESOURCE_EXHAUSTED`` and ``DEADLINE_EXCEEDED``, HTTP 429 and 5xx, and
+dropped connections. All the writes in this package are idempotent (``set``,
+``update`` and ``delete`` of a known document), so a retried commit that had
+in fact gone through does no harm. Anything else (``INVALID_ARGUMENT``, 404,
+a bad row) is raised straight away.
+
+Retries wait with exponential backoff and full jitter, honouring a
+``Retry-After`` header when there is one. Each backend (``firestore``,
+``http``) has one policy per run, shared by every thread:
+
+- a retry budget: ``retry_budget`` retries to start with, topped up by
+  ``budget_ratio`` of a retry per successful call, so a run keeps recovering
+  from the odd failure but a failing backend can't turn into a retry storm;
+- a circuit breaker: after ``failure_threshold`` consecutive transient
+  failures every caller waits ``reset_timeout`` seconds, then one probe call
+  decides whether the pool resumes or waits again.
+"""
+import logging
+import random
+import sys
+import threading
+import time
+
+RETRYABLE_CODES = {'UNAVAILABLE', 'ABORTED', 'RESOURCE_EXHAUSTED', 'DEADLINE_EXCEEDED'}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_settings = {
+    'max_attempts': 5,
+    'base_delay': 0.5,
+    'max_delay': 30.0,
+    'retry_budget': 100,
+    'budget_ratio': 0.1,
+    'failure_threshold': 5,
+    'reset_timeout': 10.0,
+    'rpc_timeout': 60.0,
+}
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def configure(**overrides):
+    """Override the settings above; drops the policies of any previous run."""
+    unknown = set(overrides) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown resilience settings: {', '.join(sorted(unknown))}")
+    _settings.update({k: v for k, v in overrides.items() if v is not None})
+    with _policies_lock:
+        _policies.clear()
+
+
+def error_code(exc):
+    """gRPC status name or HTTP status code of ``exc``, or None."""
+    # google.api_core exceptions carry both; the gRPC name is the more precise
+    grpc_code = getattr(exc, 'grpc_status_code', None)
+    if grpc_code is not None:
+        return getattr(grpc_code, 'name', str(grpc_code))
+
+    code = getattr(exc, 'code', None)
+    if callable(code):  # grpc.RpcError
+        try:
+            code = code()
+        except Exception:
+            code = None
+        code = getattr(code, 'name', code)
+    if isinstance(code, (str, int)) and not isinstance(code, bool):
+        return code
+
+    # requests.HTTPError
+    return getattr(getattr(exc, 'response', None), 'status_code', None)
+
+
+def is_retryable(exc):
+    code = error_code(exc)
+    if code in RETRYABLE_CODES or code in RETRYABLE_STATUS:
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    requests = sys.modules.get('requests')  # only set if the error can come from it
+    return bool(requests) and isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def retry_after(exc):
+    """Seconds from a ``Retry-After`` header on ``exc``, or None."""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """Token bucket of retries: each retry spends one, each success adds ``ratio``."""
+
+    def __init__(self, retries=100, ratio=0.1):
+        self.capacity = float(retries)
+        self.ratio = ratio
+        self._tokens = float(retries)
+        self._lock = threading.Lock()
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    @property
+    def remaining(self):
+        return int(self._tokens)
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures -> half open.
+
+    ``acquire`` blocks while the circuit is open. Once ``reset_timeout`` has
+    passed a single caller is let through as a probe; the rest keep waiting
+    until it reports success (closed again) or failure (open again).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0, name='backend', clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.state = 'closed'
+        self.times_opened = 0
+        self._failures = 0
+        self._opened_at = None
+        self._clock = clock
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                if self.state == 'closed':
+                    return
+                if self.state == 'open':
+                    remaining = self._opened_at + self.reset_timeout - self._clock()
+                    if remaining <= 0:
+                        self.state = 'half_open'
+                        return
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait(self.reset_timeout)
+
+    def record_success(self):
+        with self._cond:
+            self._failures = 0
+            if self.state != 'closed':
+                logging.info(f"{self.name} is healthy again, resuming")
+                self.state = 'closed'
+                self._cond.notify_all()
+
+    def record_failure(self):
+        with self._cond:
+            self._failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self._failures >= self.failure_threshold):
+                self.state = 'open'
+                self._opened_at = self._clock()
+                self.times_opened += 1
+                logging.warning(f"{self.name} looks unhealthy after {self._failures} consecutive failures, "
+                                f"pausing calls for {self.reset_timeout}s")
+                self._cond.notify_all()
+
+
+class RetryPolicy:
+    """Backoff, budget and breaker for one backend; safe to share between threads."""
+
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=30.0, budget=None, breaker=None,
+                 sleep=time.sleep, rng=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.counts = {'calls': 0, 'retries': 0, 'recovered': 0, 'gave_up': 0, 'budget_exhausted': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def delay(self, attempt, exc=None):
+        """Full jitter: uniform between 0 and the capped exponential backoff."""
+        delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        hinted = retry_after(exc)
+        if hinted is not None:
+            delay = max(delay, min(hinted, self.max_delay))
+        return delay
+
+    def call(self, fn, description='request', max_attempts=None):
+        """Return ``fn()``, retrying transient failures; re-raises the last error."""
+        max_attempts = max_attempts or self.max_attempts
+        self._count('calls')
+        attempt = 0
+        while True:
+            self.breaker.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The backend answered, it just didn't like the request
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt >= max_attempts:
+                    self._count('gave_up')
+                    logging.warning(f"Giving up on {description} after {attempt} attempts: {e}")
+                    raise
+                if not self.budget.withdraw():
+                    self._count('budget_exhausted')
+                    logging.warning(f"Retry budget exhausted, not retrying {description}: {e}")
+                    raise
+                self._count('retries')
+                delay = self.delay(attempt, e)
+                logging.warning(f"{description} failed ({error_code(e) or type(e).__name__}), "
+                                f"retry {attempt}/{max_attempts - 1} in {delay:.2f}s")
+                self._sleep(delay)
+            else:
+                self.breaker.record_success()
+                self.budget.deposit()
+                if attempt:
+                    self._count('recovered')
+                return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+        stats['budget_remaining'] = self.budget.remaining
+        stats['breaker_opened'] = self.breaker.times_opened
+        return stats
+
+
+def policy(backend='firestore'):
+    """The run-wide policy for ``backend``, created from the current settings."""
+    with _policies_lock:
+        if backend not in _policies:
+            _policies[backend] = RetryPolicy(
+                max_attempts=_settings['max_attempts'],
+                base_delay=_settings['base_delay'],
+                max_delay=_settings['max_delay'],
+                budget=RetryBudget(_settings['retry_budget'], _settings['budget_ratio']),
+                breaker=CircuitBreaker(_settings['failure_threshold'], _settings['reset_timeout'], name=backend),
+            )
+        return _policies[backend]
+
+
+def call(fn, description='request', backend='firestore', max_attempts=None):
+    return policy(backend).call(fn, description, max_attempts)
+
+
+def rpc_options():
+    """Keyword arguments for Firestore calls made through ``call``."""
+    return {'retry': None, 'timeout': _settings['rpc_timeout']}
+
+
+def commit(batch, description='commit'):
+    """``batch.commit()`` under the ``firestore`` policy, without client-side retries."""
+    return call(lambda: batch.commit(**rpc_options()), description)
+
+
+def stats():
+    """``{backend: counters}`` for the policies used so far in this run."""
+    with _policies_lock:
+        policies = dict(_policies)
+    return {backend: p.stats() for backend, p in policies.items()}
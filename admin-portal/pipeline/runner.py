@@ -0,0 +1,300 @@
+"""``run``: refresh the catalog by running only the stages whose inputs changed.
+
+The stages are the usual commands, declared in ``STAGES`` with the files they
+read and write. A stage depends on the stages that produce its inputs, plus
+any listed in ``after`` for ordering through Firestore (``verify`` reads what
+``sync`` wrote). Before a stage runs, its key is computed from its command
+line, the SHA-256 of each input file and when its ``after`` stages last ran;
+if the key matches the last successful run and its outputs still exist, the
+stage is skipped. Because file dependencies go through content hashes, a
+``join`` that rewrites an identical merged_video_data.csv does not trigger
+``sync``. Stages marked ``firestore`` also key on the database they talk to
+(emulator host, or project and credentials file), so a run against the
+emulator does not mark production up to date. Stages whose dependencies are done run in parallel (``--jobs``),
+each as its own ``python -m pipeline`` process.
+
+``sync`` deletes and rewrites the production collection, so it is marked
+``confirm``: when it is out of date it only runs with ``run --yes``, and is
+otherwise reported as ``held`` (its dependents are not run)::
+
+    python -m pipeline run                    # everything that is out of date
+    python -m pipeline run verify --dry-run   # what verify (and its upstream) would run
+    python -m pipeline run --yes --force sync
+
+State (stage keys, and file hashes cached by size and mtime so unchanged
+files are not re-read) lives in ``.pipeline-state.json``.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pipeline import paths
+
+DOWNLOAD_DIR = paths.BASE_DIR / 'downloaded_videos'
+SEARCH_INDEX_DIR = paths.BASE_DIR / 'search-index'
+
+STAGES = {
+    'join': {
+        'argv': ['join'],
+        'inputs': [paths.VIDEO_DETAILS_CSV, paths.THUMBNAILS_CSV],
+        'outputs': [paths.MERGED_CSV],
+    },
+    'download': {
+        'argv': ['download', '-o', str(DOWNLOAD_DIR)],
+        'inputs': [paths.VIDEO_DETAILS_CSV],
+        'outputs': [DOWNLOAD_DIR],
+    },
+    'update-thumbnails': {
+        'argv': ['update-thumbnails'],
+        'inputs': [paths.VIDEO_DETAILS_MODIFIED_CSV, paths.THUMBNAILS_CSV],
+        'firestore': True,
+        'default': False,  # patches documents keyed by bare video ID, the pre-sync layout
+    },
+    'sync': {
+        'argv': ['sync', '--yes'],
+        'inputs': [paths.MERGED_CSV],
+        'firestore': True,
+        'confirm': True,
+    },
+    'verify': {
+        'argv': ['verify'],
+        'inputs': [paths.MERGED_CSV],
+        'firestore': True,
+        'after': ['sync'],
+    },
+    'check-thumbnails': {
+        'argv': ['check-thumbnails'],
+        'inputs': [paths.THUMBNAILS_CSV],
+        'firestore': True,
+        'after': ['sync'],
+    },
+    'plan-index': {
+        'argv': ['plan-index'],
+        'inputs': [paths.MERGED_CSV],
+        'firestore': True,
+    },
+    'search-index': {
+        'argv': ['search-index', '-o', str(SEARCH_INDEX_DIR), '--upload'],
+        'inputs': [paths.MERGED_CSV, paths.COMPLETE_METADATA_CSV],
+        'outputs': [SEARCH_INDEX_DIR],
+        'firestore': True,  # --upload
+    },
+}
+
+
+def dependencies(stages=STAGES):
+    """``{stage: set of stages it waits for}``: producers of its inputs plus ``after``."""
+    producers = {}
+    for name, stage in stages.items():
+        for output in stage.get('outputs', []):
+            producers[str(output)] = name
+    deps = {}
+    for name, stage in stages.items():
+        deps[name] = {producers[str(path)] for path in stage.get('inputs', []) if str(path) in producers}
+        deps[name].update(stage.get('after', []))
+        deps[name].discard(name)
+    return deps
+
+
+def with_upstream(targets, deps):
+    """``targets`` and everything they depend on."""
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(deps[name])
+    return selected
+
+
+def load_state(path=paths.RUN_STATE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {}
+    state.setdefault('files', {})
+    state.setdefault('stages', {})
+    return state
+
+
+def save_state(state, path=paths.RUN_STATE):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def file_hash(path, cache):
+    """SHA-256 of ``path``, reusing ``cache`` while its size and mtime are unchanged."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    entry = cache.get(str(path))
+    if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return entry['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    cache[str(path)] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return digest.hexdigest()
+
+
+def stage_key(name, stage, state, target=None):
+    """Hash of everything that decides what the stage does; None if an input is missing.
+
+    ``target`` (``firebase.target()``) is part of the key of ``firestore`` stages.
+    """
+    inputs = {}
+    for path in stage.get('inputs', []):
+        inputs[str(path)] = file_hash(path, state['files'])
+        if inputs[str(path)] is None:
+            return None
+    after = {dep: state['stages'].get(dep, {}).get('finished') for dep in stage.get('after', [])}
+    fields = {'stage': name, 'argv': stage['argv'], 'inputs': inputs, 'after': after}
+    if stage.get('firestore'):
+        fields['target'] = target
+    payload = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def is_current(name, stage, key, state):
+    previous = state['stages'].get(name, {})
+    return (key is not None and previous.get('key') == key
+            and all(os.path.exists(path) for path in stage.get('outputs', [])))
+
+
+def run_stage(name, stage, global_argv=()):
+    """Run the stage's command in its own process; returns its exit code.
+
+    A separate process keeps each command's Firestore client, logging and
+    profiling state to itself while stages run side by side.
+    """
+    argv = [*global_argv, *stage['argv']]
+    logging.info(f"[{name}] python -m pipeline {' '.join(argv)}")
+    try:
+        return subprocess.run([sys.executable, '-m', 'pipeline', *argv], cwd=paths.BASE_DIR).returncode
+    except OSError as e:
+        logging.error(f"[{name}] could not be started: {e}")
+        return 1
+
+
+def global_options(args, name):
+    """The ``python -m pipeline`` options of this run, to pass on to stage ``name``."""
+    argv = []
+    for flag, value in (('--credentials', args.credentials), ('--emulator', args.emulator),
+                        ('--project', args.project), ('--log-file', args.log_file),
+                        ('--max-attempts', args.max_attempts), ('--retry-budget', args.retry_budget)):
+        if value is not None:
+            if flag in ('--credentials', '--log-file'):
+                value = os.path.abspath(value)  # stages run from admin-portal
+            argv += [flag, str(value)]
+    if args.profile:
+        argv.append('--profile')
+    if args.profile_dir:
+        argv += ['--profile-dir', os.path.join(os.path.abspath(args.profile_dir), name)]
+    if args.verbose:
+        argv.append('-v')
+    return argv
+
+
+def run_pipeline(targets=None, force=(), jobs=4, dry_run=False, confirmed=False, stages=STAGES,
+                 state_path=paths.RUN_STATE, execute=run_stage, target=None):
+    """Run ``targets`` (default: every default stage) and their upstream; returns ``{stage: outcome}``.
+
+    ``target`` identifies the Firestore database the stages write to (see
+    ``stage_key``).
+
+    Outcomes are ``ran``, ``skipped``, ``failed``, ``held`` (a ``confirm``
+    stage that is out of date, without ``confirmed``), ``blocked`` (an
+    upstream stage failed or was held) or, with ``dry_run``, ``would run``.
+    """
+    deps = dependencies(stages)
+    if not targets:
+        targets = [name for name, stage in stages.items() if stage.get('default', True)]
+    unknown = set(targets) - set(stages)
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(stages)})")
+    selected = with_upstream(targets, deps)
+    force_all = 'all' in force
+
+    state = load_state(state_path)
+    outcomes = {}
+
+    def decide(name):
+        """Outcome and key for ``name`` once its dependencies are done; outcome None means run it."""
+        if any(outcomes[dep] in ('failed', 'held', 'blocked') for dep in deps[name]):
+            logging.warning(f"[{name}] not run: an upstream stage failed or was held")
+            return 'blocked', None
+        if dry_run and any(outcomes[dep] == 'would run' for dep in deps[name]):
+            # Its key depends on what the upstream run will produce
+            return 'would run', None
+        stage = stages[name]
+        key = stage_key(name, stage, state, target)
+        if not (force_all or name in force) and is_current(name, stage, key, state):
+            logging.info(f"[{name}] skipped (inputs unchanged)")
+            return 'skipped', key
+        if dry_run:
+            return 'would run', key
+        if stage.get('confirm') and not confirmed:
+            logging.warning(f"[{name}] is out of date but replaces production data; rerun with --yes")
+            return 'held', key
+        return None, key
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+        while len(outcomes) < len(selected):
+            started = {name for name, _ in running.values()}
+            ready = sorted(name for name in selected - set(outcomes) - started
+                           if deps[name] <= set(outcomes))
+            for name in ready:
+                outcome, key = decide(name)
+                if outcome:
+                    outcomes[name] = outcome
+                else:
+                    running[pool.submit(execute, name, stages[name])] = (name, key)
+
+            if not running:
+                if not ready:
+                    raise ValueError(f"Stage dependencies form a cycle: {', '.join(sorted(selected - set(outcomes)))}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key = running.pop(future)
+                if future.result() != 0:
+                    outcomes[name] = 'failed'
+                else:
+                    outcomes[name] = 'ran'
+                    if key is not None:
+                        state['stages'][name] = {'key': key, 'finished': _now()}
+                        save_state(state, state_path)
+                logging.info(f"[{name}] {outcomes[name]}")
+
+    if not dry_run:
+        save_state(state, state_path)  # keeps the file hash cache current even when nothing ran
+    return outcomes
+
+
+def run(args):
+    from pipeline import firebase
+
+    outcomes = run_pipeline(args.stages, force=args.force or (), jobs=args.jobs, dry_run=args.dry_run,
+                            confirmed=args.yes, state_path=args.state, target=firebase.target(),
+                            execute=lambda name, stage: run_stage(name, stage, global_options(args, name)))
+    for name in STAGES:
+        if name in outcomes:
+            print(f"{name:<18} {outcomes[name]}")
+    return 1 if any(o in ('failed', 'held', 'blocked') for o in outcomes.values()) else 0
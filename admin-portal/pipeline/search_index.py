@@ -0,0 +1,334 @@
+"""``search-index``: prebuilt exercise search index.
+
+The searchable text of the catalog is Spanish free text (``activity``,
+``bodypart``/``bodyPart``, ``description``, ``type``), with leftover CSV
+quoting such as ``"Pecho``. This module folds accents and case, tokenizes
+those fields and builds an inverted index keyed by video file name
+(``2023_cw003.mp4``), so a lookup is a dict access and a postings
+intersection instead of a scan over every row.
+
+Serialized layout (``search-index/`` or the ``searchIndex`` collection)::
+
+    manifest.json   {'version': 3, 'shards': ['a', 'b', ...], 'prefixLength': 2,
+                     'docCount': 606, 'docChunks': 1, 'docsPerChunk': 1000}
+    docs-<n>.json   {'docs': [{'v': videoId, 'a': activity, 't': type}, ...]}
+    shard-<c>.json  {'terms': ['pecho', 'pectoral', ...],   # sorted
+                     'postings': ['0,3,1', ...],             # delta-encoded doc numbers
+                     'prefixes': {'pe': [0, 2], ...}}        # [start, end) into terms
+
+Firestore rejects arrays directly inside arrays, hence the maps and strings
+where lists of lists would be the obvious choice.
+
+Terms are sharded by their first character so a client only loads the
+shards the typed query needs. Doc numbers follow the result order (folded
+activity name, then videoId), so the best matches are the smallest numbers
+and only the ``docs-<n>`` chunks holding them are needed to show them. Each
+chunk stays far below Firestore's 1 MiB document limit whatever the size of
+the catalog.
+"""
+import bisect
+import csv
+import heapq
+import json
+import logging
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+from pipeline import resilience
+from pipeline.catalog import is_missing
+
+INDEX_VERSION = 3
+PREFIX_LENGTH = 2
+DOCS_PER_CHUNK = 1000
+SEARCH_INDEX_COLLECTION = 'searchIndex'
+
+STOPWORDS = frozenset([
+    'a', 'al', 'con', 'de', 'del', 'e', 'el', 'en', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'sin', 'su', 'un', 'una', 'y',
+])
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def fold(text):
+    """Lowercase and strip accents: ``'Tríceps'`` -> ``'triceps'``."""
+    if is_missing(text):
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def words(text):
+    """Folded words of ``text``, stopwords included."""
+    return _TOKEN_RE.findall(fold(text))
+
+
+def tokenize(text):
+    """Folded search terms of ``text``, without stopwords."""
+    return [t for t in words(text) if t not in STOPWORDS]
+
+
+def clean_field(text):
+    """Drop the stray quotes the metadata exports leave around values."""
+    if is_missing(text):
+        return ''
+    return ' '.join(str(text).replace('"', ' ').split())
+
+
+def _read_rows(csv_path):
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def collect_documents(merged_csv, metadata_csv=None):
+    """Return ``{videoId: {'activity', 'type', 'text'}}`` from the catalog CSVs.
+
+    merged_video_data.csv supplies one entry per video; complete-metadata.csv,
+    when given, adds its longer ``description`` for the same file name.
+    """
+    docs = {}
+    for row in _read_rows(merged_csv):
+        video_id = clean_field(row.get('videoId_x'))
+        if not video_id:
+            continue
+        doc = docs.setdefault(video_id, {
+            'activity': clean_field(row.get('activity')),
+            'type': clean_field(row.get('type')),
+            'text': set(),
+        })
+        for field in ('activity', 'type', 'bodypart'):
+            doc['text'].add(clean_field(row.get(field)))
+
+    if metadata_csv and os.path.exists(metadata_csv):
+        for row in _read_rows(metadata_csv):
+            video_id = clean_field(row.get('path', '')).split('/')[-1]
+            doc = docs.get(video_id)
+            if doc is None:
+                continue
+            for field in ('activity', 'bodyPart', 'description'):
+                doc['text'].add(clean_field(row.get(field)))
+
+    return docs
+
+
+def build_index(docs):
+    """Build the manifest, shards and doc chunks for ``collect_documents`` output."""
+    video_ids = sorted(docs, key=lambda video_id: (fold(docs[video_id]['activity']), video_id))
+    postings = {}
+    for doc_num, video_id in enumerate(video_ids):
+        terms = set()
+        for text in docs[video_id]['text']:
+            terms.update(tokenize(text))
+        terms.update(tokenize(video_id.rsplit('.', 1)[0].replace('_', ' ')))
+        for term in terms:
+            postings.setdefault(term, []).append(doc_num)
+
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(term[0], []).append(term)
+
+    serialized_shards = {}
+    for key, terms in shards.items():
+        prefixes = {}
+        for i, term in enumerate(terms):
+            start_end = prefixes.setdefault(term[:PREFIX_LENGTH], [i, i + 1])
+            start_end[1] = i + 1
+        serialized_shards[key] = {
+            'terms': terms,
+            'postings': [_delta_encode(postings[term]) for term in terms],
+            'prefixes': prefixes,
+        }
+
+    table = [{'v': video_id, 'a': docs[video_id]['activity'], 't': docs[video_id]['type']}
+             for video_id in video_ids]
+    doc_chunks = [{'docs': table[start:start + DOCS_PER_CHUNK]}
+                  for start in range(0, len(table), DOCS_PER_CHUNK)]
+
+    manifest = {
+        'version': INDEX_VERSION,
+        'prefixLength': PREFIX_LENGTH,
+        'shards': sorted(serialized_shards),
+        'docCount': len(table),
+        'docChunks': len(doc_chunks),
+        'docsPerChunk': DOCS_PER_CHUNK,
+    }
+    return manifest, serialized_shards, doc_chunks
+
+
+def _delta_encode(numbers):
+    previous = 0
+    encoded = []
+    for n in numbers:
+        encoded.append(str(n - previous))
+        previous = n
+    return ','.join(encoded)
+
+
+def _delta_decode(deltas):
+    total = 0
+    decoded = []
+    for d in deltas.split(','):
+        total += int(d)
+        decoded.append(total)
+    return decoded
+
+
+def _index_documents(manifest, shards, doc_chunks):
+    """``{name: content}`` of everything but the manifest."""
+    documents = {f'shard-{key}': shard for key, shard in shards.items()}
+    documents.update((f'docs-{n}', chunk) for n, chunk in enumerate(doc_chunks))
+    return documents
+
+
+def write_index(manifest, shards, doc_chunks, output_dir):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, content in _index_documents(manifest, shards, doc_chunks).items():
+        with open(output_dir / f'{name}.json', 'w', encoding='utf-8') as f:
+            json.dump(content, f, ensure_ascii=False, separators=(',', ':'))
+    with open(output_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def upload_index(db, manifest, shards, doc_chunks, collection=SEARCH_INDEX_COLLECTION):
+    """Store the index as ``searchIndex/manifest``, ``searchIndex/shard-<c>`` and ``searchIndex/docs-<n>``.
+
+    Shards and doc chunks are written before the manifest in the same batch,
+    and documents that are no longer listed are deleted, so readers never see
+    a manifest that points at a missing document.
+    """
+    batch = db.batch()
+    existing = {ref.id for ref in db.collection(collection).list_documents()}
+    documents = _index_documents(manifest, shards, doc_chunks)
+    for doc_id, content in documents.items():
+        batch.set(db.collection(collection).document(doc_id), content)
+    for doc_id in existing - set(documents) - {'manifest'}:
+        batch.delete(db.collection(collection).document(doc_id))
+    batch.set(db.collection(collection).document('manifest'), manifest)
+    resilience.commit(batch, description="search index commit")
+
+
+class SearchIndex:
+    """In-memory reader for the serialized index."""
+
+    def __init__(self, manifest, shards, doc_chunks):
+        self.prefix_length = manifest['prefixLength']
+        self.docs_per_chunk = manifest['docsPerChunk']
+        self._shards = shards
+        self._doc_chunks = doc_chunks
+        self._decoded = {}
+
+    def doc(self, doc_num):
+        """``{'v', 'a', 't'}`` of doc number ``doc_num``."""
+        return self._doc_chunks[doc_num // self.docs_per_chunk]['docs'][doc_num % self.docs_per_chunk]
+
+    @classmethod
+    def load(cls, index_dir):
+        index_dir = Path(index_dir)
+        with open(index_dir / 'manifest.json', encoding='utf-8') as f:
+            manifest = json.load(f)
+        shards = {}
+        for key in manifest['shards']:
+            with open(index_dir / f'shard-{key}.json', encoding='utf-8') as f:
+                shards[key] = json.load(f)
+        doc_chunks = []
+        for n in range(manifest['docChunks']):
+            with open(index_dir / f'docs-{n}.json', encoding='utf-8') as f:
+                doc_chunks.append(json.load(f))
+        return cls(manifest, shards, doc_chunks)
+
+    def _postings(self, key, i):
+        cache_key = (key, i)
+        decoded = self._decoded.get(cache_key)
+        if decoded is None:
+            decoded = self._decoded[cache_key] = set(_delta_decode(self._shards[key]['postings'][i]))
+        return decoded
+
+    def term_docs(self, term):
+        """Doc numbers containing exactly ``term``."""
+        shard = self._shards.get(term[0])
+        if shard is None:
+            return set()
+        terms = shard['terms']
+        i = bisect.bisect_left(terms, term)
+        if i < len(terms) and terms[i] == term:
+            return self._postings(term[0], i)
+        return set()
+
+    def prefix_docs(self, prefix):
+        """Doc numbers containing any term that starts with ``prefix``."""
+        shard = self._shards.get(prefix[0])
+        if shard is None:
+            return set()
+        terms = shard['terms']
+        if len(prefix) >= self.prefix_length:
+            bounds = shard['prefixes'].get(prefix[:self.prefix_length])
+            if bounds is None:
+                return set()
+            start, end = bounds
+        else:
+            start, end = 0, len(terms)
+        i = bisect.bisect_left(terms, prefix, start, end)
+        result = set()
+        while i < end and terms[i].startswith(prefix):
+            result |= self._postings(prefix[0], i)
+            i += 1
+        return result
+
+    def search(self, query, limit=20):
+        """Videos matching every word of ``query``; the last word may be a prefix.
+
+        Stopwords are only dropped from the complete words: the last one may be
+        the start of a longer word (``la`` -> ``lateral``).
+
+        Returns ``[(videoId, activity, type), ...]`` sorted by activity.
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+
+        matches = None
+        for word in query_words[:-1]:
+            if word in STOPWORDS:
+                continue
+            docs = self.term_docs(word)
+            matches = docs if matches is None else matches & docs
+            if not matches:
+                return []
+        docs = self.prefix_docs(query_words[-1])
+        matches = docs if matches is None else matches & docs
+        if not matches:
+            return []
+
+        # Doc numbers are in result order
+        return [(doc['v'], doc['a'], doc['t']) for doc in map(self.doc, heapq.nsmallest(limit, matches))]
+
+
+def run(args):
+    docs = collect_documents(args.csv, args.metadata)
+    manifest, shards, doc_chunks = build_index(docs)
+    term_count = sum(len(s['terms']) for s in shards.values())
+    logging.info(f"Indexed {len(docs)} videos, {term_count} terms in {len(shards)} shards")
+
+    write_index(manifest, shards, doc_chunks, args.output_dir)
+    logging.info(f"Wrote search index to {args.output_dir}")
+
+    if args.upload:
+        from pipeline.firebase import get_db
+
+        upload_index(get_db(), manifest, shards, doc_chunks)
+        logging.info(f"Uploaded search index to the {SEARCH_INDEX_COLLECTION} collection")
+
+    if args.query:
+        import time
+
+        index = SearchIndex(manifest, shards, doc_chunks)
+        start = time.perf_counter()
+        results = index.search(args.query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for video_id, activity, video_type in results:
+            print(f"{video_id}\t{video_type}\t{activity}")
+        logging.info(f"{len(results)} results for {args.query!r} in {elapsed_ms:.3f} ms")
+    return 0
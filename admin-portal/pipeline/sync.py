@@ -0,0 +1,156 @@
+"""``sync``: replace the videoMetadata collection with merged_video_data.csv."""
+import logging
+import os
+import time
+
+from pipeline import profiling, resilience
+from pipeline.catalog import (
+    VIDEO_METADATA_COLLECTION,
+    build_video_payload,
+    check_columns,
+    video_doc_id,
+)
+from pipeline.firebase import get_db, server_timestamp
+from pipeline.write_order import order_rows
+
+BATCH_SIZE = 500
+
+
+def load_catalog(csv_path):
+    import pandas as pd
+
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+    logging.info(f"Reading CSV file: {csv_path}")
+    with profiling.stage('load'):
+        df = pd.read_csv(csv_path)
+
+    logging.info(f"Loaded {len(df)} rows from CSV")
+    logging.info(f"CSV columns: {', '.join(df.columns)}")
+    with profiling.stage('validate'):
+        check_columns(df.columns)
+    return df
+
+
+def delete_collection(db, collection=VIDEO_METADATA_COLLECTION, batch_size=BATCH_SIZE,
+                      pause=1.0, progress=True):
+    """Delete every document in ``collection``; returns the number deleted."""
+    from tqdm import tqdm
+
+    docs = list(db.collection(collection).get())
+    logging.info(f"Found {len(docs)} documents to delete")
+
+    deleted_count = 0
+    with tqdm(total=len(docs), desc="Deleting documents", disable=not progress) as pbar:
+        batch = db.batch()
+        batch_count = 0
+
+        for doc in docs:
+            batch.delete(doc.reference)
+            batch_count += 1
+            deleted_count += 1
+
+            # Commit batch when it reaches the batch size
+            if batch_count >= batch_size:
+                resilience.commit(batch, description=f"delete of {batch_count} documents")
+                logging.info(f"Deleted batch of {batch_count} documents")
+                pbar.update(batch_count)
+                batch = db.batch()
+                batch_count = 0
+                time.sleep(pause)  # Avoid overwhelming Firestore
+
+        # Commit any remaining documents
+        if batch_count > 0:
+            resilience.commit(batch, description=f"delete of {batch_count} documents")
+            logging.info(f"Deleted final batch of {batch_count} documents")
+            pbar.update(batch_count)
+
+    return deleted_count
+
+
+def upload_catalog(db, df, collection=VIDEO_METADATA_COLLECTION, batch_size=BATCH_SIZE,
+                   pause=1.0, last_updated=None, progress=True):
+    """Write one document per catalog row; returns ``(added_count, error_count)``."""
+    from tqdm import tqdm
+
+    if last_updated is None:
+        last_updated = server_timestamp()
+
+    total_rows = len(df)
+    added_count = 0
+    error_count = 0
+
+    with tqdm(total=total_rows, desc="Adding documents", disable=not progress) as pbar:
+        for i in range(0, total_rows, batch_size):
+            batch_df = df.iloc[i:min(i + batch_size, total_rows)]
+            batch = db.batch()
+            batch_count = 0
+
+            with profiling.stage('build_payloads'):
+                for _, row in batch_df.iterrows():
+                    try:
+                        doc_ref = db.collection(collection).document(video_doc_id(row))
+                        batch.set(doc_ref, build_video_payload(row, last_updated))
+                        batch_count += 1
+                    except Exception as e:
+                        logging.error(f"Error processing row: {e}")
+                        error_count += 1
+
+            # Commit batch
+            if batch_count > 0:
+                try:
+                    with profiling.stage('commit'):
+                        resilience.commit(batch, description=f"commit of {batch_count} documents")
+                    added_count += batch_count
+                    logging.info(f"Added batch of {batch_count} documents")
+                except Exception as e:
+                    logging.error(f"Error committing batch: {e}")
+                    error_count += batch_count
+
+            pbar.update(len(batch_df))
+            time.sleep(pause)  # Avoid overwhelming Firestore
+
+    return added_count, error_count
+
+
+def run(args):
+    df = load_catalog(args.csv)
+    db = get_db()
+
+    if not args.yes:
+        # Confirm with user before proceeding
+        print("\n" + "!" * 80)
+        print(f"WARNING: This will DELETE ALL DOCUMENTS in the {VIDEO_METADATA_COLLECTION} collection")
+        print("and replace them with data from the CSV file.")
+        print("!" * 80)
+
+        confirmation = input("\nType 'DELETE' to confirm deletion and proceed: ")
+        if confirmation != "DELETE":
+            print("Operation cancelled by user.")
+            return 0
+
+    logging.info(f"Deleting all documents in {VIDEO_METADATA_COLLECTION} collection...")
+    with profiling.stage('delete'):
+        deleted_count = delete_collection(db, pause=args.pause)
+    logging.info(f"Successfully deleted {deleted_count} documents")
+
+    logging.info("Adding new documents from CSV data...")
+    df = order_rows(df, args.write_order)
+    added_count, error_count = upload_catalog(db, df, batch_size=args.batch_size, pause=args.pause)
+
+    # Final statistics
+    total_rows = len(df)
+    logging.info("=" * 50)
+    logging.info("Final statistics:")
+    logging.info(f"- Documents deleted: {deleted_count}")
+    logging.info(f"- Documents added: {added_count}")
+    logging.info(f"- Errors encountered: {error_count}")
+    logging.info(f"- Retried calls: {resilience.policy().stats()['retries']}")
+
+    if added_count == total_rows - error_count:
+        logging.info("SUCCESS: All valid rows were successfully added to Firebase")
+        return 0
+
+    logging.warning(f"WARNING: Only {added_count} out of {total_rows} rows were added")
+    return 1
@@ -0,0 +1,127 @@
+"""Synthetic catalogs shaped like the real scrape, for benchmarks and load tests.
+
+The real catalog has ~250 plans, 1-6 days per plan (half of all rows sit in
+single-day "Plan unique" plans), ~10 videos per day and ~600 distinct
+exercises, a few of which (jumping jacks, planks, ...) appear in most plans.
+``generate_video_details`` reproduces those proportions at any size with a
+fixed seed, producing the two inputs of ``join``: video_details.csv rows and
+azure-thumbnails-result.csv rows.
+"""
+import itertools
+import random
+
+ACTIVITIES = [
+    ('Jumping jacks', 'cardio', 'Sistema cardiovascular, Cuerpo completo'),
+    ('Crunch reverso en banco', 'strength', 'Abdominales - Abdominales rectos'),
+    ('Press de banca - Barra', 'strength', 'Pecho, Tríceps, Hombros parte delantera'),
+    ('Cinta de correr 8 km/h ~ 5 mph', 'cardio', 'Sistema cardiovascular, Piernas'),
+    ('Máquina mariposa', 'strength', 'Pecho, Hombros parte delantera'),
+    ('Overhead squat - MRB', 'strength', 'Cuádriceps, Glúteos, Hombros, Todos los abdominales'),
+    ('Flexion lateral', 'strength', 'Oblicuos'),
+    ('Planchas', 'strength', 'Pecho, Tríceps'),
+    ('Burpee con sentadilla', 'strength', 'Cuerpo completo'),
+    ('Remo con mancuerna', 'strength', 'Espalda, Bíceps'),
+]
+SERIES = ['id', 'xc', 'oa', 'cw', 'xa', 'bc', 'cm', 'impact']
+DAY_NAMES = ['día 1', 'día 2', 'día 3', 'día 4', 'día 5', 'día 6']
+
+VIDEO_DETAILS_COLUMNS = ['videoId', 'videoImg', 'videovalue', 'videoactivity', 'videotype',
+                         'videodescription', 'plan_url', 'plan_id', 'day_id', 'day_name']
+THUMBNAILS_COLUMNS = ['thumbnailId', 'videoId', 'planId', 'dayName', 'thumbnailFound',
+                      'thumbnailUploaded', 'thumbnailUrl']
+
+
+def _exercise_pool(size):
+    pool = []
+    for n in range(size):
+        activity, video_type, description = ACTIVITIES[n % len(ACTIVITIES)]
+        series = SERIES[n % len(SERIES)]
+        pool.append((f'2023_{series}{n:04d}.mp4', f'{activity} {n // len(ACTIVITIES)}',
+                     video_type, description))
+    # Zipf-like popularity: a handful of exercises show up in most plans
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(size)]
+    return pool, list(itertools.accumulate(weights))
+
+
+def _plan_days(rng):
+    """Day names for one plan: half the catalog lives in single-day plans."""
+    if rng.random() < 0.5:
+        return ['Plan unique']
+    return DAY_NAMES[:rng.choice([1, 2, 2, 3, 3, 4, 5, 6])]
+
+
+def _day_videos(rng, pool, cum_weights, count, repeat_rate=0.06):
+    """Pick a day's videos; like the real catalog, ~6% are repeats within the day."""
+    picked = []
+    seen = set()
+    while len(picked) < count:
+        video = rng.choices(pool, cum_weights=cum_weights)[0]
+        if video[0] in seen and rng.random() >= repeat_rate:
+            continue
+        seen.add(video[0])
+        picked.append(video)
+    return picked
+
+
+def generate_video_details(rows, seed=0, missing_thumbnail_rate=0.02):
+    """Return ``(video_details, thumbnails)`` as lists of dicts with ``rows`` videos."""
+    rng = random.Random(seed)
+    pool, cum_weights = _exercise_pool(max(50, min(rows // 7, 200000)))
+
+    video_details = []
+    thumbnails = []
+    plan_id = 9000000
+    day_id = 18000000
+    thumbnail_id = 3000000000
+
+    while len(video_details) < rows:
+        plan_id += rng.randint(1, 5000)
+        days = _plan_days(rng)
+        # "Plan unique" plans are long single sessions
+        videos_per_day = rng.randint(20, 60) if days == ['Plan unique'] else rng.randint(5, 15)
+        for day_name in days:
+            day_id += rng.randint(1, 50)
+            for video_id, activity, video_type, description in _day_videos(rng, pool, cum_weights, videos_per_day):
+                if len(video_details) >= rows:
+                    break
+                thumbnail_id += 1
+                video_details.append({
+                    'videoId': f'{thumbnail_id}_text',
+                    'videoImg': f'https://sagafit.virtuagym.com/thumb/activity/picture/{thumbnail_id:x}.png',
+                    'videovalue': video_id,
+                    'videoactivity': activity,
+                    'videotype': video_type,
+                    'videodescription': description,
+                    'plan_url': f'https://sagafit.virtuagym.com/exercise/workout-player?plan_id={plan_id}&day_id={day_id}',
+                    'plan_id': plan_id,
+                    'day_id': day_id,
+                    'day_name': day_name,
+                })
+                if rng.random() >= missing_thumbnail_rate:
+                    thumbnails.append({
+                        'thumbnailId': thumbnail_id,
+                        'videoId': video_id,
+                        'planId': plan_id,
+                        'dayName': day_name,
+                        'thumbnailFound': 1,
+                        'thumbnailUploaded': 1,
+                        'thumbnailUrl': f'https://sagafit.blob.core.windows.net/sagathumbnails/{plan_id}/images/{thumbnail_id}.png',
+                    })
+
+    return video_details, thumbnails
+
+
+def generate_frames(rows, seed=0):
+    """``generate_video_details`` as pandas DataFrames, ready for ``join_video_details``."""
+    import pandas as pd
+
+    video_details, thumbnails = generate_video_details(rows, seed)
+    return (pd.DataFrame(video_details, columns=VIDEO_DETAILS_COLUMNS),
+            pd.DataFrame(thumbnails, columns=THUMBNAILS_COLUMNS))
+
+
+def generate_catalog(rows, seed=0):
+    """A merged catalog DataFrame shaped like merged_video_data.csv."""
+    from pipeline.merge import join_video_details
+
+    return join_video_details(*generate_frames(rows, seed))
@@ -0,0 +1,72 @@
+"""``check-thumbnails``: report videoMetadata documents without a thumbnail."""
+import logging
+
+from pipeline.catalog import VIDEO_METADATA_COLLECTION
+from pipeline.firebase import get_db
+
+
+def summarize_thumbnails(docs):
+    """Return ``(video_data, missing)`` rows for an iterable of snapshots."""
+    video_data = []
+    for doc in docs:
+        data = doc.to_dict()
+        video_data.append({
+            'videoId': doc.id,
+            'name': data.get('name', '') or data.get('videoId', ''),
+            'path': data.get('path', '') or data.get('videoUrl', ''),
+            'has_thumbnail': bool(data.get('thumbnailUrl', '')),
+        })
+    missing = [row for row in video_data if not row['has_thumbnail']]
+    return video_data, missing
+
+
+def match_thumbnails(missing, thumbnails_df, limit=5):
+    """Try to find thumbnail rows for the first few videos without one."""
+    for row in missing[:limit]:
+        video_name = row['name']
+        # Try different matching strategies
+        matches = thumbnails_df[thumbnails_df['videoId'].str.contains(
+            video_name.replace(' ', '_'), case=False, regex=False)]
+        if not matches.empty:
+            print(f"Found match for {video_name}: {matches['thumbnailUrl'].iloc[0]}")
+            continue
+
+        # Try another approach - match by extracting video name from path
+        video_filename = row['path'].split('/')[-1] if '/' in row['path'] else ''
+        matches = thumbnails_df[thumbnails_df['videoId'].str.contains(
+            video_filename, case=False, regex=False)] if video_filename else thumbnails_df.iloc[0:0]
+        if not matches.empty:
+            print(f"Found match using path for {video_name}: {matches['thumbnailUrl'].iloc[0]}")
+        else:
+            print(f"No match found for {video_name}")
+
+
+def run(args):
+    if args.replica:
+        from pipeline import replica
+
+        db = replica.open_client(args.replica)
+    else:
+        db = get_db()
+
+    docs = db.collection(VIDEO_METADATA_COLLECTION).get()
+    video_data, missing = summarize_thumbnails(docs)
+
+    print(f"Total videos: {len(video_data)}")
+    print(f"Videos with thumbnails: {len(video_data) - len(missing)}")
+    print(f"Videos missing thumbnails: {len(missing)}")
+
+    if not missing or not args.match:
+        return 0
+
+    import pandas as pd
+
+    print("\nSample of videos missing thumbnails:")
+    print(pd.DataFrame(missing).head())
+
+    thumbnails_df = pd.read_csv(args.thumbnails)
+    logging.info(f"Loaded {len(thumbnails_df)} thumbnails from {args.thumbnails}")
+
+    print("\nAttempting to match a few videos:")
+    match_thumbnails(missing, thumbnails_df)
+    return 0
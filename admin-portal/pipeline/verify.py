@@ -0,0 +1,74 @@
+"""``verify``: compare the videoMetadata collection with merged_video_data.csv."""
+import logging
+
+from pipeline import profiling
+from pipeline.catalog import VIDEO_METADATA_COLLECTION, video_doc_id
+from pipeline.firebase import get_db
+from pipeline.write_order import doc_ids
+
+
+def count_documents(db, collection=VIDEO_METADATA_COLLECTION):
+    # Only the IDs are needed for a count, so don't pull the document bodies
+    return sum(1 for _ in db.collection(collection).list_documents())
+
+
+def verify_catalog(db, df, sample_size=5, collection=VIDEO_METADATA_COLLECTION):
+    """Check document count and a spread sample of rows; returns True when all match.
+
+    Rows sharing a document ID are one document, holding the last of them
+    (as ``sync`` writes it), so both checks run on the de-duplicated rows.
+    """
+    rows = len(df)
+    df = df.loc[~doc_ids(df).duplicated(keep='last')]
+    csv_count = len(df)
+    docs_count = count_documents(db, collection)
+
+    logging.info(f"CSV contains {rows} rows, {csv_count} distinct documents")
+    logging.info(f"Firebase collection contains {docs_count} documents")
+
+    ok = docs_count == csv_count
+    if ok:
+        logging.info("SUCCESS: Document count matches CSV")
+    else:
+        logging.warning(f"WARNING: Document count ({docs_count}) does not match CSV document count ({csv_count})")
+
+    # Sample check - verify a few evenly spaced documents
+    sample_size = min(sample_size, csv_count)
+    sample_indices = [int(i * (csv_count / sample_size)) for i in range(sample_size)]
+
+    for idx in sample_indices:
+        row = df.iloc[idx]
+        doc_id = video_doc_id(row)
+        doc = db.collection(collection).document(doc_id).get()
+
+        if not doc.exists:
+            logging.warning(f"Document {doc_id} does not exist")
+            ok = False
+            continue
+
+        doc_data = doc.to_dict()
+        if doc_data['videoId'] == row['videoId_x'] and doc_data['thumbnailUrl'] == row['thumbnailUrl']:
+            logging.info(f"Document {doc_id} data matches CSV")
+        else:
+            logging.warning(f"Document {doc_id} data does not match CSV")
+            ok = False
+
+    return ok
+
+
+def run(args):
+    import pandas as pd
+
+    if args.replica:
+        from pipeline import replica
+
+        db = replica.open_client(args.replica)
+    else:
+        db = get_db()
+
+    with profiling.stage('load'):
+        df = pd.read_csv(args.csv)
+    with profiling.stage('verify'):
+        ok = verify_catalog(db, df, sample_size=args.sample_size)
+    print("Verification completed")
+    return 0 if ok else 1